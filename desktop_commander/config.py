@@ -1,8 +1,9 @@
 import os
 import pathlib
 
-# Configuration file paths
-CONFIG_FILE = os.path.join(os.getcwd(), "config.json")
+# Configuration file paths. config.json ships inside the package, so anchor it
+# there rather than to whatever the working directory was at import time.
+CONFIG_FILE = str(pathlib.Path(__file__).resolve().parent / "config.json")
 LOG_FILE = os.path.join(os.getcwd(), "server.log")
 ERROR_LOG_FILE = os.path.join(os.getcwd(), "error.log")
 
@@ -0,0 +1,44 @@
+"""
+JSON helpers for Desktop Commander.
+Uses orjson when it is installed and falls back to the standard json module otherwise.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+if orjson is not None:
+    _ORJSON_PRETTY = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    _ORJSON_COMPACT = orjson.OPT_NON_STR_KEYS
+
+
+def dumps_bytes(obj: Any, indent: bool = True) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, pretty-printed with two spaces if indent is set."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_PRETTY if indent else _ORJSON_COMPACT)
+        except TypeError:
+            # orjson rejects a few values the stdlib accepts (e.g. ints wider than 64 bits)
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = True) -> str:
+    """Serialize obj to a JSON string, pretty-printed with two spaces if indent is set."""
+    return dumps_bytes(obj, indent).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse a JSON document from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -4,56 +4,89 @@ Handles blocked commands validation and management.
 """
 
 import os
-import json
-from typing import List, Set
+from typing import Dict, FrozenSet, List, Tuple
 from mcp.server.fastmcp import FastMCP
 
+from desktop_commander import json_utils
+
 # Default configuration path
 DEFAULT_CONFIG_PATH = os.path.join(os.getcwd(), "config.json")
 
+# Blocked when no config file exists yet or it can't be read
+DEFAULT_BLOCKED_COMMANDS = frozenset({
+    "format", "mount", "umount", "mkfs", "fdisk", "dd",
+    "sudo", "su", "passwd", "adduser", "useradd", "usermod", "groupadd"
+})
+
+# Blocked commands parsed from each config file, keyed by path, as
+# (mtime_ns, size, commands). Shared by every CommandManager in the process;
+# an edit to the file changes its stat signature and forces a re-read.
+_config_cache: Dict[str, Tuple[int, int, FrozenSet[str]]] = {}
+
+def _read_blocked_commands(config_path: str) -> FrozenSet[str]:
+    """Return the blocked commands in the config at config_path, parsing it only when it changed."""
+    st = os.stat(config_path)
+    cached = _config_cache.get(config_path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    
+    with open(config_path, "rb") as f:
+        config = json_utils.loads(f.read())
+    commands = frozenset(command.lower().strip() for command in config.get("blockedCommands", []))
+    _config_cache[config_path] = (st.st_mtime_ns, st.st_size, commands)
+    return commands
+
 class CommandManager:
     def __init__(self, config_path: str = DEFAULT_CONFIG_PATH):
         """Initialize the command manager with the given config path."""
         self.config_path = config_path
-        self.blocked_commands: Set[str] = set()
+        # Frozen so validate_command reads a snapshot; block/unblock swap in a new set
+        self.blocked_commands: FrozenSet[str] = frozenset()
         self._load_blocked_commands()
     
     def _load_blocked_commands(self) -> None:
         """Load blocked commands from config file."""
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, "r") as f:
-                    config = json.load(f)
-                self.blocked_commands = set(config.get("blockedCommands", []))
-            else:
-                # Default blocked commands
-                self.blocked_commands = {
-                    "format", "mount", "umount", "mkfs", "fdisk", "dd",
-                    "sudo", "su", "passwd", "adduser", "useradd", "usermod", "groupadd"
-                }
-                self._save_blocked_commands()
+            self.blocked_commands = _read_blocked_commands(self.config_path)
+        except FileNotFoundError:
+            # Default blocked commands
+            self.blocked_commands = DEFAULT_BLOCKED_COMMANDS
+            self._save_blocked_commands()
         except Exception as e:
             print(f"Error loading blocked commands: {e}")
             # Default to a safe set if loading fails
-            self.blocked_commands = {
-                "format", "mount", "umount", "mkfs", "fdisk", "dd",
-                "sudo", "su", "passwd", "adduser", "useradd", "usermod", "groupadd"
-            }
+            self.blocked_commands = DEFAULT_BLOCKED_COMMANDS
     
     def _save_blocked_commands(self) -> None:
         """Save blocked commands to config file."""
         try:
             config = {
-                "blockedCommands": list(sorted(self.blocked_commands))
+                "blockedCommands": sorted(self.blocked_commands)
             }
-            with open(self.config_path, "w") as f:
-                json.dump(config, f, indent=2)
+            # Write a temporary file and swap it in so a crash mid-write
+            # cannot leave a truncated config behind
+            tmp_path = f"{self.config_path}.tmp.{os.getpid()}"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(json_utils.dumps_bytes(config))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.config_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            st = os.stat(self.config_path)
+            _config_cache[self.config_path] = (st.st_mtime_ns, st.st_size, self.blocked_commands)
         except Exception as e:
             print(f"Error saving blocked commands: {e}")
     
     def validate_command(self, command: str) -> bool:
         """Check if a command is allowed to run."""
-        base_command = command.split()[0].lower().strip()
+        # Only the first word matters, so stop splitting after it
+        base_command = command.split(None, 1)[0].lower()
         return base_command not in self.blocked_commands
     
     def block_command(self, command: str) -> bool:
@@ -62,7 +95,7 @@ class CommandManager:
         if command in self.blocked_commands:
             return False
         
-        self.blocked_commands.add(command)
+        self.blocked_commands = self.blocked_commands | {command}
         self._save_blocked_commands()
         return True
     
@@ -72,19 +105,21 @@ class CommandManager:
         if command not in self.blocked_commands:
             return False
         
-        self.blocked_commands.remove(command)
+        self.blocked_commands = self.blocked_commands - {command}
         self._save_blocked_commands()
         return True
     
     def list_blocked_commands(self) -> List[str]:
         """Return a sorted list of blocked commands."""
-        return sorted(list(self.blocked_commands))
+        return sorted(self.blocked_commands)
 
 
 def register_command_tools(mcp_server: FastMCP, command_manager: CommandManager = None) -> None:
     """Register command management tools with the MCP server."""
     if command_manager is None:
-        command_manager = CommandManager()
+        # Share the module-level default rather than loading a second manager
+        from desktop_commander import mcp_command_manager
+        command_manager = mcp_command_manager.command_manager
     
     @mcp_server.tool()
     def block_command(command: str) -> str:
@@ -0,0 +1,118 @@
+// Long-lived Node worker: connects to the memory server once, then answers
+// newline-delimited JSON requests ({"id", "command", "args"}) on stdin with
+// {"id", "result"} or {"id", "error"} lines on stdout. Requests are handled
+// concurrently, so responses may arrive out of order.
+//
+// Usage: node memory_bridge_worker.js <server name> <path to claude_desktop_config.json>
+
+const fs = require('fs');
+const { Client } = require('@modelcontextprotocol/sdk/client/index.js');
+const { StdioClientTransport } = require('@modelcontextprotocol/sdk/client/stdio.js');
+const readline = require('readline');
+
+const serverName = process.argv[2];
+const configPath = process.argv[3];
+const MAX_RETRY_DELAY_MS = 30000;
+
+let config = null;
+let clientPromise = null;
+let retryDelay = 0;
+let retryAt = 0;
+
+function loadConfig() {
+    // Parsed once per worker; the Python side restarts the worker when the file changes
+    if (!config) {
+        config = JSON.parse(fs.readFileSync(configPath, 'utf8'));
+    }
+    return config;
+}
+
+async function connect() {
+    // Get memory server config
+    const config = loadConfig();
+    if (!config.mcpServers || !config.mcpServers[serverName]) {
+        throw new Error('Memory server not configured in claude_desktop_config.json');
+    }
+    const memoryConfig = config.mcpServers[serverName];
+
+    const client = new Client({
+        name: 'desktop-commander-memory-bridge',
+        version: '1.0.0'
+    });
+    const transport = new StdioClientTransport({
+        command: memoryConfig.command,
+        args: memoryConfig.args,
+        env: memoryConfig.env || {}
+    });
+    await client.connect(transport);
+    return client;
+}
+
+function getClient() {
+    if (!clientPromise) {
+        const wait = Math.max(0, retryAt - Date.now());
+        clientPromise = new Promise(resolve => setTimeout(resolve, wait))
+            .then(connect)
+            .then(client => {
+                retryDelay = 0;
+                // Reconnect on the next request if the memory server goes away
+                client.onclose = () => { clientPromise = null; };
+                return client;
+            }, error => {
+                // Back off exponentially between failed connection attempts
+                clientPromise = null;
+                retryDelay = Math.min(retryDelay ? retryDelay * 2 : 500, MAX_RETRY_DELAY_MS);
+                retryAt = Date.now() + retryDelay;
+                throw error;
+            });
+    }
+    return clientPromise;
+}
+
+const PARAMS = {
+    read_graph: args => ({}),
+    search_nodes: args => ({ query: args[0] || '' }),
+    open_nodes: args => ({ names: args })
+};
+
+async function handle(message) {
+    const buildParams = PARAMS[message.command];
+    if (!buildParams) {
+        throw new Error(`Unknown command: ${message.command}`);
+    }
+    const client = await getClient();
+    return client.request({
+        method: message.command,
+        params: buildParams(message.args || [])
+    }, {});
+}
+
+const rl = readline.createInterface({ input: process.stdin });
+
+rl.on('line', async line => {
+    let message;
+    try {
+        message = JSON.parse(line);
+    } catch (error) {
+        console.error('Invalid request:', line);
+        return;
+    }
+    try {
+        const result = await handle(message);
+        process.stdout.write(JSON.stringify({ id: message.id, result }) + '\n');
+    } catch (error) {
+        process.stdout.write(JSON.stringify({ id: message.id, error: error.message }) + '\n');
+    }
+});
+
+rl.on('close', async () => {
+    if (clientPromise) {
+        try {
+            const client = await clientPromise;
+            await client.close();
+        } catch (error) {
+            // Already disconnected
+        }
+    }
+    process.exit(0);
+});
@@ -3,32 +3,41 @@ Filesystem tools for the Desktop Commander MCP Server.
 Includes file operations, search, and path utilities.
 """
 
+import asyncio
+import difflib
+import fnmatch
+import functools
 import json
 import os
 import re
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Union, Any
+from types import SimpleNamespace
+from typing import List, Optional, Tuple, Union, Any
 
-# Import current_project from project module (at runtime to avoid circular imports)
-# This will be used for project-relative path handling
-current_project = None
+# The project module is imported at runtime to avoid circular imports. It is
+# looked up on every call because use_project replaces current_project.
 def _get_current_project():
     """Get the current project information, handling circular imports."""
-    global current_project
-    if current_project is None:
-        try:
-            from desktop_commander.tools.project import current_project as proj
-            current_project = proj
-        except ImportError:
-            # Fallback if import fails
-            current_project = {"path": None, "name": None, "type": None}
-    return current_project
+    try:
+        from desktop_commander.tools import project
+    except ImportError:
+        # Fallback if import fails
+        return SimpleNamespace(path=None, name=None, type=None)
+    return project.current_project
+
+def _get_base_directory() -> str:
+    """Directory relative paths resolve against: the active project, else the working directory."""
+    return _get_current_project().path or os.getcwd()
 
 # === Path Utilities ===
 
+# Prefixes that mark a path as relative to the current project
+PROJECT_PATH_PREFIXES = ("proj:", "project:")
+
 def _resolve_project_path(path: str) -> str:
     """
     Resolve a path that might be relative to the current project.
@@ -43,47 +52,70 @@ def _resolve_project_path(path: str) -> str:
     # Get the current project if needed
     project = _get_current_project()
     
-    # Handle proj: prefix for project-relative paths
-    if path.startswith("proj:"):
-        rel_path = path[5:].lstrip("/\\")
-        if not project["path"]:
-            raise ValueError("No active project. Use discover_projects and use_project first.")
-        return os.path.join(project["path"], rel_path)
-    elif path.startswith("project:"):
-        rel_path = path[8:].lstrip("/\\")
-        if not project["path"]:
-            raise ValueError("No active project. Use discover_projects and use_project first.")
-        return os.path.join(project["path"], rel_path)
+    # Handle proj:/project: prefixes for project-relative paths
+    for prefix in PROJECT_PATH_PREFIXES:
+        if path.startswith(prefix):
+            if not project.path:
+                raise ValueError("No active project. Use discover_projects and use_project first.")
+            rel_path = path[len(prefix):].lstrip("/\\")
+            return os.path.join(project.path, rel_path)
         
     # Handle when just the project name is provided
-    if (project["path"] is not None and 
-        (path == project["name"] or 
-         path == os.path.basename(project["path"]))):
+    if (project.path is not None and 
+        (path == project.name or 
+         path == os.path.basename(project.path))):
         print(f"Note: Using full project path for '{path}'", file=sys.stderr)
-        return project["path"]
+        return project.path
         
     # Default - just return the path unchanged
     return path
 
-def _get_whitelisted_directories() -> List[str]:
+@functools.lru_cache(maxsize=1024)
+def _normalize_path(p: Optional[str]) -> str:
+    """
+    Normalize path for consistent cross-platform comparison:
+    1. Use os.path.normpath to handle . and .. and redundant separators
+    2. Convert to lowercase for case-insensitive comparison
+    3. Replace separators with a consistent character
+    
+    This ensures paths like 'C:\\Users', 'C:/Users', and 'c:/users' all match.
+    Pure string work, so results are memoized; tools tend to hit the same paths.
     """
-    Get the list of whitelisted directories from config or defaults.
+    if p is None:
+        return ""
+        
+    # Normalize path with OS-specific normalization
+    norm_path = os.path.normpath(p).lower()
+    
+    # Convert all separators to forward slashes for consistent comparison
+    # This works for both Windows and Unix
+    norm_path = norm_path.replace('\\', '/')
+    
+    # Ensure trailing slash consistency
+    if norm_path.endswith('/'):
+        norm_path = norm_path[:-1]
+        
+    return norm_path
+
+# Whitelist entries that come from config.json and the home directory, as
+# (directory, normalized directory) pairs. They don't change while the server
+# runs, so they are built on first use; refresh_allowed_dirs() rebuilds them.
+_configured_dirs: Optional[List[Tuple[str, str]]] = None
+
+def _load_configured_directories() -> List[str]:
+    """
+    Get the whitelisted directories from config or defaults.
     Handles both relative (to home) and absolute paths for Linux and Windows.
     """
     home_dir = os.path.expanduser("~")
+    allowed = []
     
-    # Start with default allowed directories
-    allowed = [
-        os.getcwd(),  # Current working directory is always allowed
-    ]
-    
-    # Try to load whitelist from config
+    # Try to load whitelist from config. The project module parses config.json
+    # once per process; a missing file comes back as defaults with no whitelist.
     try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                config = json.load(f)
-                
+        from desktop_commander.tools import project
+        config = project.load_config()
+        if config:
             # Get dir_whitelist from config
             whitelist = config.get("dir_whitelist", [])
             
@@ -133,24 +165,63 @@ def _get_whitelisted_directories() -> List[str]:
         # Default to home directory if error
         allowed.append(home_dir)
     
-    # Print the allowed directories for debugging
-    print(f"Whitelisted directories: {allowed}", file=sys.stderr)
-        
+    # Print the configured directories for debugging
+    print(f"Whitelisted directories from config: {allowed}", file=sys.stderr)
+    
     return allowed
 
+def refresh_allowed_dirs() -> None:
+    """Re-read config.json and rebuild the configured whitelist on next use."""
+    global _configured_dirs
+    from desktop_commander.tools import project
+    project.load_config.cache_clear()
+    _configured_dirs = None
+
+def _get_allowed_entries() -> List[Tuple[str, str]]:
+    """
+    Get (directory, normalized directory) pairs for every allowed directory.
+    
+    The current working directory and the active project can change at runtime,
+    so they are looked up on each call; the configured entries are cached.
+    """
+    global _configured_dirs
+    if _configured_dirs is None:
+        _configured_dirs = [(d, _normalize_path(d)) for d in _load_configured_directories()]
+    
+    # The current working directory is always allowed, and so is the active
+    # project, which relative paths resolve against
+    entries = [(d, _normalize_path(d)) for d in (os.getcwd(), _get_current_project().path) if d]
+    entries.extend(_configured_dirs)
+    return entries
+
+def _get_whitelisted_directories() -> List[str]:
+    """Get the list of whitelisted directories from the working directory, active project and config."""
+    return [d for d, _ in _get_allowed_entries()]
+
+def _is_within(normalized_path: str, entries: List[Tuple[str, str]]) -> Optional[str]:
+    """Return the allowed directory containing a normalized path, or None."""
+    for allowed_dir, normalized_allowed in entries:
+        # A path is allowed if:
+        # 1. It's exactly the same as an allowed directory
+        # 2. It starts with the allowed directory followed by a path separator
+        if (normalized_path == normalized_allowed or 
+            normalized_path.startswith(normalized_allowed + '/')):
+            return allowed_dir
+    return None
+
 def _validate_path(requested_path: str) -> str:
     """
     Validate that a path is within allowed directories based on the whitelist.
     Returns the absolute path if valid, raises Exception if not.
     
     Handles:
-    - Paths relative to current directory
+    - Paths relative to the active project (or the current directory if none)
     - Paths relative to home directory (~)
     - Absolute paths
     - Windows and Linux path formats
     """
     # Get the whitelisted directories
-    allowed_directories = _get_whitelisted_directories()
+    allowed_entries = _get_allowed_entries()
     
     # Expand ~ to user's home directory
     if requested_path.startswith("~/") or requested_path == "~":
@@ -162,73 +233,125 @@ def _validate_path(requested_path: str) -> str:
     # Get absolute path
     absolute = (
         os.path.abspath(expanded_path) if os.path.isabs(expanded_path) 
-        else os.path.abspath(os.path.join(os.getcwd(), expanded_path))
+        else os.path.abspath(os.path.join(_get_base_directory(), expanded_path))
     )
     
-    # Normalize paths for comparison - handle Windows/Linux differences
-    def normalize_path(p):
-        """
-        Normalize path for consistent cross-platform comparison:
-        1. Use os.path.normpath to handle . and .. and redundant separators
-        2. Convert to lowercase for case-insensitive comparison
-        3. Replace separators with a consistent character
-        
-        This ensures paths like 'C:\\Users', 'C:/Users', and 'c:/users' all match.
-
-        """
-        if p is None:
-            return ""
-            
-        # Normalize path with OS-specific normalization
-        norm_path = os.path.normpath(p).lower()
-        
-        # Convert all separators to forward slashes for consistent comparison
-        # This works for both Windows and Unix
-        norm_path = norm_path.replace('\\', '/')
-        
-        # Ensure trailing slash consistency
-        if norm_path.endswith('/'):
-            norm_path = norm_path[:-1]
-            
-        return norm_path
-    
-    normalized_requested = normalize_path(absolute)
-    
     # Check if path is within allowed directories
-    is_allowed = False
-    for allowed_dir in allowed_directories:
-        normalized_allowed = normalize_path(allowed_dir)
-        
-        # A path is allowed if:
-        # 1. It's exactly the same as an allowed directory
-        # 2. It starts with the allowed directory followed by a path separator
-        if (normalized_requested == normalized_allowed or 
-            normalized_requested.startswith(normalized_allowed + '/')):
-            is_allowed = True
-            print(f"Path allowed: {requested_path} matches whitelist entry: {allowed_dir}", file=sys.stderr)
-            break
-    
-    if not is_allowed:
+    allowed_dir = _is_within(_normalize_path(absolute), allowed_entries)
+    if allowed_dir is None:
         # List the allowed directories in the error message to help with debugging
-        allowed_dirs_str = ", ".join(allowed_directories)
+        allowed_dirs_str = ", ".join(d for d, _ in allowed_entries)
         raise Exception(f"Access denied - path outside whitelisted directories: {absolute}\nAllowed directories: {allowed_dirs_str}")
+    print(f"Path allowed: {requested_path} matches whitelist entry: {allowed_dir}", file=sys.stderr)
     
-    # Check symlinks to prevent path traversal attacks
-    if os.path.exists(absolute) and os.path.islink(absolute):
+    # Check symlinks to prevent path traversal attacks. This touches the
+    # filesystem, so it runs on every call rather than being cached.
+    if os.path.islink(absolute):
         real_path = os.path.realpath(absolute)
-        normalized_real = normalize_path(real_path)
-        
-        is_real_allowed = any(
-            normalized_real == normalize_path(dir) or 
-            normalized_real.startswith(normalize_path(dir) + '/') 
-            for dir in allowed_directories
-        )
-        
-        if not is_real_allowed:
+        if _is_within(_normalize_path(real_path), allowed_entries) is None:
             raise Exception(f"Access denied - symlink target outside whitelisted directories: {real_path}")
     
     return absolute
 
+def _compile_file_pattern(file_pattern: str):
+    """
+    Turn a filename glob into a predicate, matching the way fnmatch.fnmatch would.
+    
+    The glob is compiled once instead of per file, and a plain "*.ext" pattern
+    becomes a suffix check where filenames are case-sensitive.
+    """
+    # fnmatch.fnmatch applies os.path.normcase, which ignores case on Windows
+    case_insensitive = os.path.normcase("A") == "a"
+    
+    suffix = file_pattern[1:]
+    if (file_pattern.startswith("*") and not case_insensitive
+            and not any(c in suffix for c in "*?[")):
+        return lambda name: name.endswith(suffix)
+    
+    return re.compile(fnmatch.translate(file_pattern), re.IGNORECASE if case_insensitive else 0).match
+
+@functools.lru_cache(maxsize=1)
+def _find_ripgrep() -> Optional[str]:
+    """
+    Locate the rg executable for search_code, or None if it isn't installed.
+    
+    The PATH search happens once; call _find_ripgrep.cache_clear() to look again.
+    """
+    return shutil.which("rg")
+
+# Threads for the search_code fallback, which spends its time waiting on file reads
+SEARCH_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Larger files are searched line by line rather than read whole into memory
+LITERAL_SEARCH_MAX_BYTES = 4 * 1024 * 1024
+
+# Characters with special meaning in a regular expression outside a character class
+_REGEX_META = frozenset(r".^$*+?{}[]|()\\")
+
+def _search_file_literal(file_path: str, needle: bytes, ignore_case: bool, limit: int) -> Optional[List[str]]:
+    """
+    Find the lines of a file containing needle, formatted like search_code results.
+    
+    Searches the raw bytes with bytes.find and only decodes the lines that match.
+    Returns at most limit results, or None when the line-by-line search has to
+    handle the file: it is larger than LITERAL_SEARCH_MAX_BYTES, uses bare
+    carriage returns as line breaks, or needs case folding beyond ASCII, which
+    bytes.lower cannot do (e.g. the Kelvin sign matching "k").
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > LITERAL_SEARCH_MAX_BYTES:
+            return None
+        data = f.read()
+    if data.count(b"\r") != data.count(b"\r\n"):
+        return None
+    if ignore_case and not data.isascii():
+        return None
+    
+    haystack = data.lower() if ignore_case else data
+    results = []
+    line_no = 1
+    counted_to = 0
+    pos = haystack.find(needle)
+    while pos != -1 and len(results) < limit:
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        line_end = data.find(b"\n", pos)
+        if line_end == -1:
+            line_end = len(data)
+        
+        line_no += data.count(b"\n", counted_to, line_start)
+        counted_to = line_start
+        line = data[line_start:line_end].decode("utf-8", errors="ignore")
+        results.append(f"{file_path}:{line_no}: {line.strip()}")
+        
+        # One result per line, like the regex search
+        pos = haystack.find(needle, line_end)
+    return results
+
+def _grep_file(file_path: str, pattern_re, needle: Optional[bytes], ignore_case: bool, limit: int) -> List[str]:
+    """
+    Return up to limit search_code result lines for one file.
+    
+    Uses the bytes.find search when needle is set and the file allows it, and
+    otherwise runs pattern_re over each line. Unreadable files give no results.
+    """
+    try:
+        if needle is not None:
+            matches = _search_file_literal(file_path, needle, ignore_case, limit)
+            if matches is not None:
+                return matches
+        
+        matches = []
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for i, line in enumerate(f, 1):
+                if pattern_re.search(line):
+                    matches.append(f"{file_path}:{i}: {line.strip()}")
+                    if len(matches) >= limit:
+                        break
+        return matches
+    except (UnicodeDecodeError, PermissionError, FileNotFoundError):
+        # Skip files that can't be read
+        return []
+
 def get_allowed_directories() -> List[str]:
     """Get the list of whitelisted directories."""
     return _get_whitelisted_directories()
@@ -239,10 +362,18 @@ def normalize_line_endings(text: str) -> str:
     """Normalize line endings to avoid platform-specific issues."""
     return text.replace('\r\n', '\n')
 
+def _json_value_equal(a: Any, b: Any) -> bool:
+    """Compare two JSON values, treating e.g. True and 1 as different at any depth."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_json_value_equal(v, b[k]) for k, v in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_json_value_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
 def create_unified_diff(original_content: str, new_content: str, filepath: str = 'file') -> str:
     """Create a unified diff between two text contents."""
-    import difflib
-    
     # Normalize line endings for consistent diff
     original_normalized = normalize_line_endings(original_content)
     new_normalized = normalize_line_endings(new_content)
@@ -287,6 +418,11 @@ def register_tools(mcp):
         Returns:
             File contents or error message
         """
+        # File I/O blocks, so run it in a worker thread to keep the event loop free
+        return await asyncio.to_thread(_read_file_impl, path)
+    
+    def _read_file_impl(path: str) -> str:
+        """Implementation of read_file, run off the event loop."""
         try:
             # Resolve and validate path
             resolved_path = _resolve_project_path(path)
@@ -400,8 +536,8 @@ def register_tools(mcp):
         Returns:
             Success message or error
         """
-        # Call the implementation function
-        return _write_file_impl(path, content, True)
+        # Call the implementation function in a worker thread; file I/O blocks
+        return await asyncio.to_thread(_write_file_impl, path, content, True)
 
     @mcp.tool()
     async def write_json_file(path: str, content_json: Union[str, Any]) -> str:
@@ -424,7 +560,7 @@ def register_tools(mcp):
         """
         try:
             # Call the implementation function directly to bypass type validation
-            return _write_file_impl(path, content_json, auto_format_json=True)
+            return await asyncio.to_thread(_write_file_impl, path, content_json, auto_format_json=True)
         except Exception as e:
             print(f"Error in write_json_file: {str(e)}", file=sys.stderr)
             return f"Error writing JSON file: {str(e)}"
@@ -476,8 +612,9 @@ def register_tools(mcp):
                 return f"Error: Invalid JSON updates - {error_detail}. No changes applied."
             
             # Read existing JSON or create new if file doesn't exist
+            file_exists = os.path.exists(valid_path)
             try:
-                if os.path.exists(valid_path):
+                if file_exists:
                     with open(valid_path, "r", encoding="utf-8") as f:
                         try:
                             data = json.load(f)
@@ -493,8 +630,9 @@ def register_tools(mcp):
             except Exception as e:
                 return f"Error reading JSON file: {str(e)}"
             
-            # Apply the updates
+            # Apply the updates, tracking whether any value actually changed
             changes = []
+            dirty = not file_exists
             
             for key, value in updates_dict.items():
                 # Check for nested keys using dot notation
@@ -514,14 +652,22 @@ def register_tools(mcp):
                     # Update the final value
                     final_key = parts[-1]
                     old_value = current.get(final_key, None)
+                    if final_key not in current or not _json_value_equal(old_value, value):
+                        dirty = True
                     current[final_key] = value
                     changes.append(f"{key}: {old_value} -> {value}")
                 else:
                     # Direct key update
                     old_value = data.get(key, None)
+                    if key not in data or not _json_value_equal(old_value, value):
+                        dirty = True
                     data[key] = value
                     changes.append(f"{key}: {old_value} -> {value}")
             
+            # Skip serialization and disk I/O when every update was a no-op
+            if not dirty:
+                return f"JSON file {valid_path} already up to date, no changes written"
+            
             # Write the updated JSON back to the file
             with open(valid_path, "w", encoding="utf-8") as f:
                 json.dump(data, indent=2, fp=f, ensure_ascii=False)
@@ -624,16 +770,20 @@ def register_tools(mcp):
         Returns:
             Formatted directory listing or error message
         """
+        # Listing can block on slow or network filesystems, so use a worker thread
+        return await asyncio.to_thread(_list_directory_impl, path)
+    
+    def _list_directory_impl(path: str) -> str:
+        """Implementation of list_directory, run off the event loop."""
         try:
             # Resolve and validate path
             resolved_path = _resolve_project_path(path)
             valid_path = _validate_path(resolved_path)
             
-            entries = []
-            for entry in os.listdir(valid_path):
-                full_path = os.path.join(valid_path, entry)
-                entry_type = "[DIR]" if os.path.isdir(full_path) else "[FILE]"
-                entries.append(f"{entry_type} {entry}")
+            # scandir reports entry types from the directory read itself, so only
+            # symlinks need a stat to tell whether they point at a directory
+            with os.scandir(valid_path) as it:
+                entries = [f"{'[DIR]' if entry.is_dir() else '[FILE]'} {entry.name}" for entry in it]
             
             if not entries:
                 return f"Directory {valid_path} is empty"
@@ -802,18 +952,26 @@ def register_tools(mcp):
         Returns:
             Search results or error message
         """
+        # Both ripgrep and the fallback block, so run the search in a worker thread
+        return await asyncio.to_thread(_search_code_impl, path, pattern, file_pattern, ignore_case, max_results)
+    
+    def _search_code_impl(path: str, pattern: str, file_pattern: Optional[str],
+                          ignore_case: bool, max_results: int) -> str:
+        """Implementation of search_code, run off the event loop."""
         try:
             # Validate path
             valid_path = _validate_path(path)
             
             # Try to use ripgrep if available
-            rg_path = shutil.which("rg")
+            rg_path = _find_ripgrep()
             
             if rg_path:
                 # Build ripgrep command
                 args = [
                     rg_path,
                     "--line-number",  # Include line numbers
+                    "--color=never",  # Plain text even if rg thinks it has a terminal
+                    "--no-messages",  # Keep per-file errors from filling the stderr pipe
                 ]
                 
                 if ignore_case:
@@ -828,25 +986,36 @@ def register_tools(mcp):
                 # Add pattern and path
                 args.extend([pattern, valid_path])
                 
-                # Run command
+                # Run command, reading matches as they arrive. -m caps matches per
+                # file, so stop ripgrep once max_results lines have come in overall.
                 try:
-                    process = subprocess.run(args, capture_output=True, text=True)
+                    lines = []
+                    truncated = False
+                    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                          text=True) as process:
+                        for line in process.stdout:
+                            lines.append(line)
+                            if max_results and len(lines) >= max_results:
+                                truncated = True
+                                process.terminate()
+                                break
+                        stderr = process.stderr.read()
                     
-                    if process.returncode in (0, 1):  # 0: matches found, 1: no matches
-                        if not process.stdout:
+                    # 0: matches found, 1: no matches
+                    if truncated or process.returncode in (0, 1):
+                        if not lines:
                             return f"No matches found for '{pattern}' in {valid_path}"
                         
-                        return process.stdout
+                        return "".join(lines)
                     else:
                         # Fall back to Python implementation on error
-                        raise Exception(f"ripgrep error: {process.stderr}")
+                        raise Exception(f"ripgrep error: {stderr}")
                 except Exception:
                     # Fall back to Python implementation
                     pass
             
             # Fallback: Python-based search
             results = []
-            count = 0
             
             # Prepare regex pattern
             if ignore_case:
@@ -854,12 +1023,17 @@ def register_tools(mcp):
             else:
                 pattern_re = re.compile(pattern)
             
+            # A plain single-line ASCII pattern needs no regex engine; search file bytes directly
+            needle = None
+            if (pattern and pattern.isascii() and "\n" not in pattern and "\r" not in pattern
+                    and not _REGEX_META.intersection(pattern)):
+                needle = (pattern.lower() if ignore_case else pattern).encode("ascii")
+            
             # Prepare file pattern
-            file_matcher = None
-            if file_pattern:
-                import fnmatch
-                file_matcher = lambda f: fnmatch.fnmatch(f, file_pattern)
+            file_matcher = _compile_file_pattern(file_pattern) if file_pattern else None
             
+            # Collect the files to search first; walking is cheap next to reading them
+            file_paths = []
             for root, dirs, files in os.walk(valid_path):
                 # Skip hidden directories
                 dirs[:] = [d for d in dirs if not d.startswith('.')]
@@ -867,27 +1041,23 @@ def register_tools(mcp):
                 for name in files:
                     if file_matcher and not file_matcher(name):
                         continue
-                    
-                    try:
-                        file_path = os.path.join(root, name)
-                        
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            for i, line in enumerate(f, 1):
-                                if pattern_re.search(line):
-                                    results.append(f"{file_path}:{i}: {line.strip()}")
-                                    count += 1
-                                    
-                                    if count >= max_results:
-                                        break
-                        
-                        if count >= max_results:
+                    file_paths.append(os.path.join(root, name))
+            
+            # Reading files is I/O-bound, so search them concurrently. map keeps
+            # the walk order, so results come out the same as a sequential search.
+            if file_paths:
+                pool = ThreadPoolExecutor(max_workers=min(SEARCH_MAX_WORKERS, len(file_paths)))
+                try:
+                    for matches in pool.map(
+                            lambda file_path: _grep_file(file_path, pattern_re, needle, ignore_case, max_results),
+                            file_paths):
+                        results.extend(matches)
+                        if len(results) >= max_results:
+                            del results[max_results:]
                             break
-                    except (UnicodeDecodeError, PermissionError, FileNotFoundError):
-                        # Skip files that can't be read
-                        continue
-                
-                if count >= max_results:
-                    break
+                finally:
+                    # Don't wait for files queued after the result limit was reached
+                    pool.shutdown(wait=False, cancel_futures=True)
             
             if not results:
                 return f"No matches found for '{pattern}' in {valid_path}"
@@ -1022,6 +1192,11 @@ def register_tools(mcp):
         Returns:
             Success message or detailed error information, with git-style diff when changes are made
         """
+        # Reading, matching and writing all block, so do them in a worker thread
+        return await asyncio.to_thread(_edit_block_impl, file, search, replace, dry_run)
+    
+    def _edit_block_impl(file: str, search: str, replace: str, dry_run: bool) -> str:
+        """Implementation of edit_block, run off the event loop."""
         try:
             # Extract edit parameters
             file_path = file
@@ -1102,7 +1277,6 @@ def register_tools(mcp):
             )
             
             # Create a unified diff
-            import difflib
             diff = difflib.unified_diff(
                 content.splitlines(),
                 new_content.splitlines(),
@@ -8,10 +8,86 @@ as queryable resources through the MCP protocol.
 
 import os
 import sys
-import json
+import copy
+import functools
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+from desktop_commander import json_utils
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GRAPH_SUFFIX = "_graph.json"
+ZSTD_SUFFIX = ".zst"
+ZSTD_LEVEL = 3
+MAX_GRAPH_BYTES = 32 * 1024 * 1024  # Largest graph payload save_project_knowledge accepts
+
+
+# Path separators in project names become underscores in graph file names
+_SAFE_NAME_TABLE = str.maketrans({"/": "_", "\\": "_"})
+
+
+# Graph files are private to this process tree and never symlinks
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+
+
+class GraphFormatError(Exception):
+    """A graph file exists but is stored in a format this installation cannot read."""
+
+
+def _read_file(file_path: str) -> Tuple[bytes, os.stat_result]:
+    """Read a whole file with os.read, sized from fstat, returning its bytes and that stat result."""
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        st = os.fstat(fd)
+        data = os.read(fd, st.st_size)
+        # Regular files normally fill the request in one read; finish any short read
+        while len(data) < st.st_size:
+            chunk = os.read(fd, st.st_size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data, st
+    finally:
+        os.close(fd)
+
+
+def _file_signature(st: os.stat_result) -> Tuple[int, int]:
+    """Identify a file version by modification time and size for cache validation."""
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _is_valid_graph(graph_data: Any) -> bool:
+    """Check that parsed graph data is an object whose entities/relations, if present, are lists."""
+    return (
+        isinstance(graph_data, dict)
+        and isinstance(graph_data.get("entities", []), list)
+        and isinstance(graph_data.get("relations", []), list)
+    )
+
+
+def encode_graph_payload(graph_data: str) -> Optional[bytes]:
+    """Encode an incoming JSON graph payload as UTF-8, or return None if it exceeds MAX_GRAPH_BYTES."""
+    # A str is never longer than its UTF-8 encoding, so skip encoding obviously oversized input
+    if len(graph_data) > MAX_GRAPH_BYTES:
+        return None
+    raw = graph_data.encode("utf-8")
+    return raw if len(raw) <= MAX_GRAPH_BYTES else None
+
+
+def _new_cache_entry(signature: Tuple[int, int], graph_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create an object-cache entry; entity indices are filled in on first use."""
+    return {
+        "signature": signature,
+        "data": graph_data,
+        "by_name": None,
+        "by_type": None,
+        "pretty_json": None
+    }
+
 
 class KnowledgeGraph:
     """Knowledge graph manager for storing and retrieving project information."""
@@ -20,6 +96,11 @@ class KnowledgeGraph:
         self.entities = {}
         self.relations = []
         self.storage_dir = self._get_storage_dir()
+        # Parsed graphs keyed by project name. Each entry holds the file's
+        # (mtime_ns, size) signature, the graph data and lazily built indices.
+        self._obj_cache: Dict[str, Dict[str, Any]] = {}
+        # (plain JSON path, zstd path) keyed by project name
+        self._path_cache: Dict[str, Tuple[str, str]] = {}
         
     def _get_storage_dir(self) -> str:
         """Get the storage directory for knowledge graph files."""
@@ -32,47 +113,229 @@ class KnowledgeGraph:
         
         return storage_dir
     
+    def _get_graph_paths(self, project_name: str) -> Tuple[str, str]:
+        """Get the plain JSON and zstd-compressed file paths for a project's knowledge graph."""
+        paths = self._path_cache.get(project_name)
+        if paths is None:
+            safe_name = project_name.translate(_SAFE_NAME_TABLE)
+            json_path = os.path.join(self.storage_dir, f"{safe_name}{GRAPH_SUFFIX}")
+            paths = (json_path, json_path + ZSTD_SUFFIX)
+            self._path_cache[project_name] = paths
+        return paths
+    
     def get_graph_path(self, project_name: str) -> str:
-        """Get the file path for a project's knowledge graph."""
-        safe_name = project_name.replace("/", "_").replace("\\", "_")
-        return os.path.join(self.storage_dir, f"{safe_name}_graph.json")
+        """
+        Get the file path a project's knowledge graph is saved to.
+        
+        Graphs are zstd-compressed when the zstandard package is installed.
+        Without it they are plain JSON, unless the project already has a
+        compressed graph, which is never replaced by an uncompressed one.
+        """
+        json_path, zst_path = self._get_graph_paths(project_name)
+        return zst_path if zstandard is not None else json_path
+    
+    def _stat_graph(self, project_name: str) -> Optional[Tuple[str, os.stat_result]]:
+        """Find a project's graph file, preferring the compressed form over a legacy plain one."""
+        # Look for the compressed file even without zstandard, so a graph saved by
+        # another installation is reported as unreadable rather than missing
+        for file_path in self._get_graph_paths(project_name)[::-1]:
+            try:
+                return file_path, os.stat(file_path)
+            except FileNotFoundError:
+                continue
+        return None
     
-    def save_graph(self, project_name: str, graph_data: Dict[str, Any]) -> bool:
-        """Save knowledge graph data for a project."""
+    def save_graph(self, project_name: str, graph_data: Dict[str, Any], pretty: bool = False) -> bool:
+        """
+        Save knowledge graph data for a project.
+        
+        Graphs are stored as compact JSON unless pretty is set; resources
+        pretty-print from the cached object when serving them. With zstandard
+        installed the file is compressed and any legacy plain copy is removed.
+        """
         try:
             file_path = self.get_graph_path(project_name)
+            if zstandard is None and os.path.exists(file_path + ZSTD_SUFFIX):
+                # Saving plain JSON here would leave the compressed graph in
+                # front of it, and dropping that would lose the stored graph
+                raise GraphFormatError(
+                    f"{file_path + ZSTD_SUFFIX} is zstd-compressed; install the zstandard package to update it"
+                )
+            tmp_path = f"{file_path}.tmp.{os.getpid()}"
+            
+            payload = json_utils.dumps_bytes(graph_data, indent=pretty)
+            if zstandard is not None:
+                payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+            
+            # Write to a temporary file and swap it in so readers never see a partial
+            # graph; fsync first so a crash cannot leave the new name pointing at
+            # unwritten data
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
             
-            with open(file_path, "w") as f:
-                json.dump(graph_data, f, indent=2)
+            if zstandard is not None:
+                try:
+                    os.unlink(self._get_graph_paths(project_name)[0])
+                except FileNotFoundError:
+                    pass
+            
+            # Keep the just-saved object so the next load skips re-parsing
+            self._obj_cache[project_name] = _new_cache_entry(_file_signature(os.stat(file_path)), graph_data)
                 
             return True
         except Exception as e:
             print(f"Error saving knowledge graph: {str(e)}", file=sys.stderr)
             return False
     
+    def _get_cache_entry(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """Return the cache entry for a project's graph, reloading it if the file changed."""
+        found = self._stat_graph(project_name)
+        if found is None:
+            self._obj_cache.pop(project_name, None)
+            return None
+        file_path, st = found
+        
+        # Reuse the parsed graph while the file is unchanged on disk
+        entry = self._obj_cache.get(project_name)
+        if entry is not None and entry["signature"] == _file_signature(st):
+            return entry
+            
+        # Take the signature from the opened file, in case it was replaced since the stat
+        payload, st = _read_file(file_path)
+        signature = _file_signature(st)
+        if file_path.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise GraphFormatError(
+                    f"{file_path} is zstd-compressed; install the zstandard package to read it"
+                )
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        graph_data = json_utils.loads(payload)
+        
+        entry = _new_cache_entry(signature, graph_data)
+        self._obj_cache[project_name] = entry
+        return entry
+    
+    def _get_indices(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """Return a cache entry with its name/type entity indices built."""
+        entry = self._get_cache_entry(project_name)
+        if entry is None:
+            return None
+            
+        if entry["by_name"] is None:
+            by_name = {}
+            by_type = {}
+            entities = entry["data"].get("entities") or []
+            for entity in entities:
+                # The first entity with a given name wins, matching a linear scan
+                by_name.setdefault(entity.get("name"), entity)
+                by_type.setdefault(entity.get("entityType"), []).append(entity)
+            entry["by_name"] = by_name
+            entry["by_type"] = by_type
+            
+        return entry
+    
+    def get_signature(self, project_name: str) -> Optional[Tuple[int, int]]:
+        """Return the (mtime_ns, size) signature of a project's graph file, or None if it does not exist."""
+        try:
+            found = self._stat_graph(project_name)
+        except OSError:
+            return None
+        return _file_signature(found[1]) if found is not None else None
+    
+    def _load_cached_graph(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a project's graph without copying it.
+        
+        The result is the cached object shared by every reader, so callers
+        must not modify it.
+        """
+        try:
+            entry = self._get_cache_entry(project_name)
+            return entry["data"] if entry is not None else None
+        except GraphFormatError:
+            # Report unreadable graphs to the caller instead of treating them as missing
+            raise
+        except Exception as e:
+            print(f"Error loading knowledge graph: {str(e)}", file=sys.stderr)
+            return None
+    
     def load_graph(self, project_name: str) -> Optional[Dict[str, Any]]:
-        """Load knowledge graph data for a project."""
+        """
+        Load knowledge graph data for a project.
+        
+        Returns a copy, so callers can modify it before saving without
+        touching the cached graph or its indices.
+        """
+        graph_data = self._load_cached_graph(project_name)
+        return copy.deepcopy(graph_data) if graph_data is not None else None
+    
+    def load_graph_json(self, project_name: str) -> Optional[str]:
+        """
+        Load a project's knowledge graph as pretty-printed JSON.
+        
+        The serialized form is cached with the parsed graph, so repeated reads of an
+        unchanged graph skip re-serialization. Returns None if no graph exists.
+        """
         try:
-            file_path = self.get_graph_path(project_name)
-            
-            if not os.path.exists(file_path):
+            entry = self._get_cache_entry(project_name)
+            if entry is None or not entry["data"]:
                 return None
-                
-            with open(file_path, "r") as f:
-                return json.load(f)
+            if entry["pretty_json"] is None:
+                entry["pretty_json"] = json_utils.dumps(entry["data"])
+            return entry["pretty_json"]
+        except GraphFormatError:
+            raise
+        except Exception as e:
+            print(f"Error loading knowledge graph: {str(e)}", file=sys.stderr)
+            return None
+    
+    def get_entity(self, project_name: str, entity_name: str) -> Optional[Dict[str, Any]]:
+        """Look up an entity by name in a project's knowledge graph. The entity is shared with the cache; do not modify it."""
+        try:
+            entry = self._get_indices(project_name)
+            return entry["by_name"].get(entity_name) if entry is not None else None
+        except GraphFormatError:
+            raise
         except Exception as e:
             print(f"Error loading knowledge graph: {str(e)}", file=sys.stderr)
             return None
     
+    def get_entities_by_type(self, project_name: str, entity_type: str) -> List[Dict[str, Any]]:
+        """Get all entities of a given type in a project's knowledge graph. The list is shared with the cache; do not modify it."""
+        try:
+            entry = self._get_indices(project_name)
+            return entry["by_type"].get(entity_type, []) if entry is not None else []
+        except GraphFormatError:
+            raise
+        except Exception as e:
+            print(f"Error loading knowledge graph: {str(e)}", file=sys.stderr)
+            return []
+    
     def list_graphs(self) -> List[str]:
         """List all available knowledge graphs."""
+        suffixes = (GRAPH_SUFFIX, GRAPH_SUFFIX + ZSTD_SUFFIX)
         try:
-            graphs = []
-            for file in os.listdir(self.storage_dir):
-                if file.endswith("_graph.json"):
-                    graphs.append(file.replace("_graph.json", ""))
-            return graphs
-        except Exception as e:
+            # A project may briefly have both a compressed and a legacy file
+            graphs = {}
+            with os.scandir(self.storage_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.endswith(suffixes) or not entry.is_file(follow_symlinks=False):
+                        continue
+                    suffix = GRAPH_SUFFIX if name.endswith(GRAPH_SUFFIX) else GRAPH_SUFFIX + ZSTD_SUFFIX
+                    graphs[name[:-len(suffix)]] = None
+            return list(graphs)
+        except OSError as e:
             print(f"Error listing knowledge graphs: {str(e)}", file=sys.stderr)
             return []
 
@@ -81,6 +344,37 @@ class KnowledgeGraph:
 graph_manager = KnowledgeGraph()
 
 
+# Resource responses for single entities and entity types. The graph file
+# signature is part of the key, so a changed graph never hits a stale entry.
+@functools.lru_cache(maxsize=2048)
+def _entity_json(project_name: str, entity_name: str, signature: Optional[Tuple[int, int]]) -> str:
+    graph_data = graph_manager._load_cached_graph(project_name)
+    
+    if not graph_data or "entities" not in graph_data:
+        return f"No entities found for project: {project_name}"
+        
+    entity = graph_manager.get_entity(project_name, entity_name)
+    if entity is not None:
+        return json_utils.dumps(entity)
+            
+    return f"Entity '{entity_name}' not found in project: {project_name}"
+
+
+@functools.lru_cache(maxsize=2048)
+def _entities_by_type_json(project_name: str, entity_type: str, signature: Optional[Tuple[int, int]]) -> str:
+    graph_data = graph_manager._load_cached_graph(project_name)
+    
+    if not graph_data or "entities" not in graph_data:
+        return f"No entities found for project: {project_name}"
+        
+    entities = graph_manager.get_entities_by_type(project_name, entity_type)
+    
+    if not entities:
+        return f"No entities of type '{entity_type}' found in project: {project_name}"
+        
+    return json_utils.dumps(entities)
+
+
 def register_tools(mcp):
     """Register knowledge graph tools with the MCP server."""
     
@@ -88,62 +382,42 @@ def register_tools(mcp):
     @mcp.resource("knowledge://{project_name}/graph")
     def project_knowledge_graph(project_name: str) -> str:
         """Get the complete knowledge graph for a project."""
-        graph_data = graph_manager.load_graph(project_name)
+        graph_json = graph_manager.load_graph_json(project_name)
         
-        if not graph_data:
+        if graph_json is None:
             return f"No knowledge graph found for project: {project_name}"
             
-        return json.dumps(graph_data, indent=2)
+        return graph_json
     
     @mcp.resource("knowledge://{project_name}/entities")
     def project_entities(project_name: str) -> str:
         """Get all entities in a project's knowledge graph."""
-        graph_data = graph_manager.load_graph(project_name)
+        graph_data = graph_manager._load_cached_graph(project_name)
         
         if not graph_data or "entities" not in graph_data:
             return f"No entities found for project: {project_name}"
             
-        return json.dumps(graph_data["entities"], indent=2)
+        return json_utils.dumps(graph_data["entities"])
     
     @mcp.resource("knowledge://{project_name}/relations")
     def project_relations(project_name: str) -> str:
         """Get all relations in a project's knowledge graph."""
-        graph_data = graph_manager.load_graph(project_name)
+        graph_data = graph_manager._load_cached_graph(project_name)
         
         if not graph_data or "relations" not in graph_data:
             return f"No relations found for project: {project_name}"
             
-        return json.dumps(graph_data["relations"], indent=2)
+        return json_utils.dumps(graph_data["relations"])
     
     @mcp.resource("knowledge://{project_name}/entity/{entity_name}")
     def project_entity(project_name: str, entity_name: str) -> str:
         """Get a specific entity from a project's knowledge graph."""
-        graph_data = graph_manager.load_graph(project_name)
-        
-        if not graph_data or "entities" not in graph_data:
-            return f"No entities found for project: {project_name}"
-            
-        for entity in graph_data["entities"]:
-            if entity.get("name") == entity_name:
-                return json.dumps(entity, indent=2)
-                
-        return f"Entity '{entity_name}' not found in project: {project_name}"
+        return _entity_json(project_name, entity_name, graph_manager.get_signature(project_name))
     
     @mcp.resource("knowledge://{project_name}/entity_type/{entity_type}")
     def project_entities_by_type(project_name: str, entity_type: str) -> str:
         """Get all entities of a specific type from a project's knowledge graph."""
-        graph_data = graph_manager.load_graph(project_name)
-        
-        if not graph_data or "entities" not in graph_data:
-            return f"No entities found for project: {project_name}"
-            
-        entities = [entity for entity in graph_data["entities"] 
-                    if entity.get("entityType") == entity_type]
-        
-        if not entities:
-            return f"No entities of type '{entity_type}' found in project: {project_name}"
-            
-        return json.dumps(entities, indent=2)
+        return _entities_by_type_json(project_name, entity_type, graph_manager.get_signature(project_name))
     
     # Now register tools for managing knowledge graphs
     @mcp.tool()
@@ -159,8 +433,16 @@ def register_tools(mcp):
             Success or error message
         """
         try:
-            # Parse the graph data from JSON
-            data = json.loads(graph_data)
+            # Reject oversized payloads before parsing
+            raw = encode_graph_payload(graph_data)
+            if raw is None:
+                return f"Knowledge graph data too large (limit is {MAX_GRAPH_BYTES} bytes)"
+            
+            # Parse the graph data from JSON once; it is stored in compact form
+            data = json_utils.loads(raw)
+            
+            if not _is_valid_graph(data):
+                return "Invalid knowledge graph data: expected an object with 'entities' and 'relations' lists"
             
             # Save to the knowledge graph manager
             success = graph_manager.save_graph(project_name, data)
@@ -169,7 +451,7 @@ def register_tools(mcp):
                 return f"Successfully saved knowledge graph for project: {project_name}"
             else:
                 return f"Failed to save knowledge graph for project: {project_name}"
-        except json.JSONDecodeError:
+        except json_utils.JSONDecodeError:
             return "Invalid JSON data provided for knowledge graph"
         except Exception as e:
             return f"Error saving project knowledge: {str(e)}"
@@ -204,11 +486,11 @@ def register_tools(mcp):
             Knowledge graph data as JSON string
         """
         try:
-            graph_data = graph_manager.load_graph(project_name)
+            graph_json = graph_manager.load_graph_json(project_name)
             
-            if not graph_data:
+            if graph_json is None:
                 return f"No knowledge graph found for project: {project_name}"
                 
-            return json.dumps(graph_data, indent=2)
+            return graph_json
         except Exception as e:
             return f"Error getting project knowledge: {str(e)}"
@@ -9,28 +9,165 @@ tools and resources to interact with the knowledge graph maintained by that serv
 
 import os
 import sys
-import json
+import atexit
 import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Optional, Any, Tuple
-import tempfile
 import time
 
+from desktop_commander import json_utils
+
 # Constants
 MEMORY_SERVER_NAME = "memory"  # The name as configured in claude_desktop_config.json
+MAX_CACHE_ENTRIES = 128  # Upper bound on cached read_graph/open_nodes results
+REQUEST_TIMEOUT = 30  # Seconds to wait for the worker to answer a request
+CLAUDE_CONFIG_PATH = os.path.join(os.path.expanduser("~"), "Library", "Application Support",
+                                  "Claude", "claude_desktop_config.json")
+
+# Monotonic clock for cache expiry, bound once for the cache hot path
+_now = time.monotonic
+
+# Long-lived Node worker shipped with the package; see data/memory_bridge_worker.js
+WORKER_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "memory_bridge_worker.js")
 
 
 class MemoryBridge:
     """Bridge to the Memory MCP server."""
     
     def __init__(self):
-        self.cache = {}
-        self.cache_expiry = {}
+        # LRU of cache key -> (expiry on the monotonic clock, value)
+        self.cache: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
         self.cache_timeout = 60  # Cache timeout in seconds
+        self._worker: Optional[subprocess.Popen] = None
+        self._worker_lock = threading.Lock()
+        self._next_id = 0
+        # In-flight requests: request id -> (worker it was sent to, future for its response)
+        self._pending: Dict[int, Tuple[subprocess.Popen, Future]] = {}
+        self._config_signature: Optional[Tuple[int, int]] = None
+    
+    def _read_config_signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of claude_desktop_config.json, or None if missing."""
+        try:
+            st = os.stat(CLAUDE_CONFIG_PATH)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _ensure_worker(self) -> subprocess.Popen:
+        """Start the Node worker if it is not running or the Claude config has changed."""
+        config_signature = self._read_config_signature()
+        if self._worker is not None and self._worker.poll() is None:
+            if config_signature == self._config_signature:
+                return self._worker
+            # The worker parses the config once, so restart it to pick up changes
+            self._stop_worker()
+            
+        # stderr is inherited so worker diagnostics land in the server log
+        self._worker = subprocess.Popen(
+            ["node", WORKER_SCRIPT_PATH, MEMORY_SERVER_NAME, CLAUDE_CONFIG_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        self._config_signature = config_signature
+        threading.Thread(
+            target=self._read_responses,
+            args=(self._worker,),
+            name="memory-bridge-reader",
+            daemon=True
+        ).start()
+        return self._worker
+    
+    def _read_responses(self, worker: subprocess.Popen) -> None:
+        """Resolve pending futures from a worker's response lines until it exits."""
+        try:
+            for line in worker.stdout:
+                try:
+                    response = json_utils.loads(line)
+                except json_utils.JSONDecodeError:
+                    print(f"Invalid JSON response from memory bridge worker: {line}", file=sys.stderr)
+                    continue
+                    
+                with self._worker_lock:
+                    pending = self._pending.pop(response.get("id"), None)
+                if pending is not None:
+                    pending[1].set_result(response)
+        except (OSError, ValueError):
+            # stdout was closed while the worker was being stopped
+            pass
+            
+        # Fail whatever this worker still owed so callers can retry
+        with self._worker_lock:
+            if self._worker is worker:
+                self._stop_worker()
+            orphaned = [request_id for request_id, (owner, _) in self._pending.items() if owner is worker]
+            futures = [self._pending.pop(request_id)[1] for request_id in orphaned]
+        for future in futures:
+            future.set_exception(BrokenPipeError("Memory bridge worker exited unexpectedly"))
+    
+    def _stop_worker(self) -> None:
+        """Terminate the Node worker if it is running."""
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        try:
+            if worker.stdin:
+                worker.stdin.close()
+            worker.terminate()
+            worker.wait(timeout=2)
+        except Exception:
+            worker.kill()
+    
+    def close(self) -> None:
+        """Shut down the worker."""
+        with self._worker_lock:
+            self._stop_worker()
+    
+    def _submit(self, command: str, args: List[str] = None) -> Future:
+        """
+        Send a request to the Node worker without waiting for its response.
+        
+        Several requests can be in flight at once; each returned future resolves
+        to the worker's raw response object.
+        """
+        future: Future = Future()
+        with self._worker_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            request = json_utils.dumps({"id": request_id, "command": command, "args": args or []}, indent=False)
+            
+            # Retry once with a fresh worker if the current one has exited
+            for attempt in range(2):
+                worker = self._ensure_worker()
+                self._pending[request_id] = (worker, future)
+                try:
+                    worker.stdin.write(request + "\n")
+                    worker.stdin.flush()
+                    break
+                except (BrokenPipeError, OSError):
+                    self._pending.pop(request_id, None)
+                    self._stop_worker()
+                    if attempt:
+                        raise
+        return future
+    
+    def _discard(self, future: Future) -> None:
+        """Forget a request whose caller stopped waiting for it."""
+        with self._worker_lock:
+            for request_id, (_, pending) in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[request_id]
     
     def _run_memory_command(self, command: str, args: List[str] = None) -> Tuple[bool, Any]:
         """
         Run a command against the Memory MCP server.
         
+        Requests are sent as single JSON lines to a long-lived Node worker that
+        keeps its connection to the memory server open between calls.
+        
         Args:
             command: The command to run (read_graph, create_entities, etc.)
             args: List of arguments for the command
@@ -39,132 +176,81 @@ class MemoryBridge:
             Tuple of (success, result data)
         """
         try:
-            # Create a temporary file to store the script
-            with tempfile.NamedTemporaryFile(mode='w+', suffix='.js', delete=False) as script_file:
-                script_path = script_file.name
-                
-                # Write a simple script to call the memory server
-                script_content = f"""
-                const {{ Client }} = require('@modelcontextprotocol/sdk/client/index.js');
-                const {{ StdioClientTransport }} = require('@modelcontextprotocol/sdk/client/stdio.js');
-
-                async function main() {{
-                    // Get configuration
-                    const configPath = process.env.HOME + '/Library/Application Support/Claude/claude_desktop_config.json';
-                    const config = require(configPath);
-                    
-                    // Get memory server config
-                    if (!config.mcpServers || !config.mcpServers.{MEMORY_SERVER_NAME}) {{
-                        console.error('Memory server not configured in claude_desktop_config.json');
-                        process.exit(1);
-                    }}
-                    
-                    const memoryConfig = config.mcpServers.{MEMORY_SERVER_NAME};
-                    
-                    // Create client
-                    const client = new Client({{
-                        name: 'desktop-commander-memory-bridge',
-                        version: '1.0.0'
-                    }});
-                    
-                    // Create transport
-                    const transport = new StdioClientTransport({{
-                        command: memoryConfig.command,
-                        args: memoryConfig.args,
-                        env: memoryConfig.env || {{}}
-                    }});
+            # Resubmit once if the worker died before answering
+            for attempt in range(2):
+                future = self._submit(command, args)
+                try:
+                    response = future.result(timeout=REQUEST_TIMEOUT)
+                    break
+                except BrokenPipeError:
+                    if attempt:
+                        return False, "Memory bridge worker exited unexpectedly"
+                except FutureTimeoutError:
+                    self._discard(future)
+                    return False, f"Memory command timed out after {REQUEST_TIMEOUT} seconds"
                     
-                    try {{
-                        // Connect and initialize
-                        await client.connect(transport);
-                        
-                        // Execute the specified command
-                        let result;
-                        switch ('{command}') {{
-                            case 'read_graph':
-                                result = await client.request({{
-                                    method: 'read_graph',
-                                    params: {{}}
-                                }}, {{}});
-                                break;
-                            case 'search_nodes':
-                                result = await client.request({{
-                                    method: 'search_nodes',
-                                    params: {{ query: '{args[0] if args else ""}' }}
-                                }}, {{}});
-                                break;
-                            case 'open_nodes':
-                                result = await client.request({{
-                                    method: 'open_nodes',
-                                    params: {{ names: {json.dumps(args) if args else []} }}
-                                }}, {{}});
-                                break;
-                            // Add other commands as needed
-                            default:
-                                console.error(`Unknown command: {command}`);
-                                process.exit(1);
-                        }}
-                        
-                        // Output the result as JSON
-                        console.log(JSON.stringify(result));
-                        
-                        // Close the client
-                        await client.close();
-                    }} catch (error) {{
-                        console.error('Error:', error.message);
-                        process.exit(1);
-                    }}
-                }}
-
-                main().catch(error => {{
-                    console.error('Unhandled error:', error);
-                    process.exit(1);
-                }});
-                """
-                
-                script_file.write(script_content)
-            
-            # Execute the script with node
-            cmd = ["node", script_path]
-            result = subprocess.check_output(cmd, stderr=subprocess.PIPE, text=True)
-            
-            # Clean up the temporary file
-            os.unlink(script_path)
-            
-            # Parse the result as JSON
-            try:
-                data = json.loads(result)
-                return True, data
-            except json.JSONDecodeError:
-                return False, f"Invalid JSON response: {result}"
-                
-        except subprocess.CalledProcessError as e:
-            return False, f"Command failed: {e.stderr}"
+            if "error" in response:
+                return False, f"Command failed: {response['error']}"
+            return True, response.get("result")
         except Exception as e:
             return False, f"Error executing memory command: {str(e)}"
     
+    def _cache_get(self, key: Any) -> Optional[Any]:
+        """Return a cached value if present and unexpired, refreshing its recency."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if _now() >= entry[0]:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return entry[1]
+    
+    def _cache_put(self, key: Any, value: Any) -> None:
+        """Cache a value, evicting the least recently used entries over the size cap."""
+        self.cache[key] = (_now() + self.cache_timeout, value)
+        self.cache.move_to_end(key)
+        while len(self.cache) > MAX_CACHE_ENTRIES:
+            self.cache.popitem(last=False)
+    
     def read_graph(self) -> Optional[Dict[str, Any]]:
         """Read the complete knowledge graph from the Memory MCP server."""
         # Check cache first
-        if "graph" in self.cache:
-            import time
-            if time.time() < self.cache_expiry.get("graph", 0):
-                return self.cache["graph"]
+        cached = self._cache_get("graph")
+        if cached is not None:
+            return cached
         
         # Execute the command
         success, result = self._run_memory_command("read_graph")
         
         if success:
             # Cache the result
-            import time
-            self.cache["graph"] = result
-            self.cache_expiry["graph"] = time.time() + self.cache_timeout
+            self._cache_put("graph", result)
             return result
         else:
             print(f"Error reading memory graph: {result}", file=sys.stderr)
             return None
     
-    def search_nodes(self, query: str) -> Optional[List[Dict[str, Any]]]:
+    def read_graph_json(self) -> Optional[str]:
+        """
+        Read the memory graph as pretty-printed JSON.
+        
+        The serialized form is cached alongside the graph it was built from, so it
+        is reused until read_graph fetches a new graph.
+        """
+        graph_data = self.read_graph()
+        if not graph_data:
+            return None
+            
+        cached = self._cache_get("graph_json")
+        if cached is not None and cached[0] is graph_data:
+            return cached[1]
+            
+        graph_json = json_utils.dumps(graph_data)
+        self._cache_put("graph_json", (graph_data, graph_json))
+        return graph_json
+    
+    def search_nodes(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Search for nodes in the memory graph.
         
@@ -172,17 +258,51 @@ class MemoryBridge:
             query: Search query string
             
         Returns:
-            List of matching nodes
+            Dictionary with the matching entities and the relations between them
         """
+        # Answer from the cached graph when we have one; the server matches the
+        # same fields (name, type, observations) case-insensitively
+        graph_data = self._cache_get("graph")
+        if graph_data is not None:
+            return self._search_cached_graph(graph_data, query)
+        
         # Cannot cache search results as query changes
         success, result = self._run_memory_command("search_nodes", [query])
         
         if success:
-            return result.get("nodes", [])
+            # Same shape as a search of the cached graph
+            return {
+                "entities": result.get("entities", []),
+                "relations": result.get("relations", [])
+            }
         else:
             print(f"Error searching memory nodes: {result}", file=sys.stderr)
             return None
     
+    @staticmethod
+    def _search_cached_graph(graph_data: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """
+        Filter a cached graph's entities by a case-insensitive substring query.
+        
+        Like the server, returns the matching entities plus the relations whose
+        both ends are among them. Missing or null fields match nothing.
+        """
+        needle = query.lower()
+        entities = []
+        for entity in graph_data.get("entities") or []:
+            if (needle in str(entity.get("name") or "").lower()
+                    or needle in str(entity.get("entityType") or "").lower()
+                    or any(needle in str(observation).lower() for observation in entity.get("observations") or []
+                            if observation is not None)):
+                entities.append(entity)
+        
+        names = {entity.get("name") for entity in entities} - {None}
+        relations = [
+            relation for relation in graph_data.get("relations") or []
+            if relation.get("from") in names and relation.get("to") in names
+        ]
+        return {"entities": entities, "relations": relations}
+    
     def open_nodes(self, names: List[str]) -> Optional[Dict[str, Any]]:
         """
         Get specific nodes by name.
@@ -194,22 +314,19 @@ class MemoryBridge:
             Dictionary with entities and relations for the requested nodes
         """
         # Cache key based on sorted names
-        cache_key = "open_" + "_".join(sorted(names))
+        cache_key = ("open", tuple(sorted(names)))
         
         # Check cache first
-        if cache_key in self.cache:
-            import time
-            if time.time() < self.cache_expiry.get(cache_key, 0):
-                return self.cache[cache_key]
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         # Execute the command
         success, result = self._run_memory_command("open_nodes", names)
         
         if success:
             # Cache the result
-            import time
-            self.cache[cache_key] = result
-            self.cache_expiry[cache_key] = time.time() + self.cache_timeout
+            self._cache_put(cache_key, result)
             return result
         else:
             print(f"Error opening memory nodes: {result}", file=sys.stderr)
@@ -218,6 +335,7 @@ class MemoryBridge:
 
 # Global instance of the memory bridge
 memory_bridge = MemoryBridge()
+atexit.register(memory_bridge.close)
 
 
 def register_tools(mcp):
@@ -227,12 +345,12 @@ def register_tools(mcp):
     @mcp.resource("memory://graph")
     def memory_graph() -> str:
         """Get the complete knowledge graph from the Memory MCP server."""
-        graph_data = memory_bridge.read_graph()
+        graph_json = memory_bridge.read_graph_json()
         
-        if not graph_data:
+        if graph_json is None:
             return "Error retrieving memory graph"
             
-        return json.dumps(graph_data, indent=2)
+        return graph_json
     
     @mcp.resource("memory://search/{query}")
     def memory_search(query: str) -> str:
@@ -242,10 +360,10 @@ def register_tools(mcp):
         if nodes is None:
             return f"Error searching memory for: {query}"
             
-        if not nodes:
+        if not nodes["entities"]:
             return f"No results found for query: {query}"
             
-        return json.dumps(nodes, indent=2)
+        return json_utils.dumps(nodes)
     
     @mcp.resource("memory://entity/{entity_name}")
     def memory_entity(entity_name: str) -> str:
@@ -263,7 +381,7 @@ def register_tools(mcp):
         # Get the first matching entity
         for entity in entities:
             if entity.get("name") == entity_name:
-                return json.dumps(entity, indent=2)
+                return json_utils.dumps(entity)
                 
         return f"Entity not found: {entity_name}"
     
@@ -276,12 +394,12 @@ def register_tools(mcp):
         Returns:
             Complete knowledge graph as JSON
         """
-        graph_data = memory_bridge.read_graph()
+        graph_json = memory_bridge.read_graph_json()
         
-        if not graph_data:
+        if graph_json is None:
             return "Error retrieving memory graph"
             
-        return json.dumps(graph_data, indent=2)
+        return graph_json
     
     @mcp.tool()
     def search_memory_nodes(query: str) -> str:
@@ -292,14 +410,14 @@ def register_tools(mcp):
             query: Search query string
             
         Returns:
-            List of matching nodes as JSON
+            Matching entities and the relations between them as JSON
         """
         nodes = memory_bridge.search_nodes(query)
         
         if nodes is None:
             return f"Error searching memory for: {query}"
             
-        return json.dumps(nodes, indent=2)
+        return json_utils.dumps(nodes)
     
     @mcp.tool()
     def get_memory_entities(entity_names: str) -> str:
@@ -318,7 +436,7 @@ def register_tools(mcp):
         if not result:
             return f"Error retrieving entities: {entity_names}"
             
-        return json.dumps(result, indent=2)
+        return json_utils.dumps(result)
     
     @mcp.tool()
     def sync_memory_to_project_knowledge(project_name: str) -> str:
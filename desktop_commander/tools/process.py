@@ -5,36 +5,57 @@ Process management tools for the Desktop Commander MCP Server.
 import os
 import time
 import signal
+import asyncio
 import psutil
 
+# cpu_percent measures usage between two calls, so list_processes primes every
+# process, waits this long once, then reads them all
+CPU_SAMPLE_INTERVAL = 0.1  # seconds
+
+def _list_processes() -> str:
+    """Build the list_processes report. Blocks for CPU_SAMPLE_INTERVAL plus the /proc reads."""
+    procs = []
+    for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'memory_percent']):
+        try:
+            # The first call only records a baseline and always returns 0.0
+            proc.cpu_percent(None)
+            procs.append(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    
+    time.sleep(CPU_SAMPLE_INTERVAL)
+    
+    processes = []
+    for proc in procs:
+        try:
+            # Get process info
+            pinfo = proc.info
+            command = " ".join(pinfo['cmdline']) if pinfo['cmdline'] else pinfo['name']
+            memory_percent = pinfo['memory_percent'] or 0.0
+            
+            processes.append(
+                f"PID: {pinfo['pid']}, Command: {command}, "
+                f"CPU: {proc.cpu_percent(None):.1f}%, Memory: {memory_percent:.1f}%"
+            )
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    
+    if not processes:
+        return "No processes found"
+    
+    return "\n".join(processes)
+
 def register_tools(mcp):
     """Register process management tools with the MCP server."""
     
     @mcp.tool()
-    def list_processes() -> str:
+    async def list_processes() -> str:
         """
         List all running processes. Returns process information including PID, command name, 
         CPU usage, and memory usage.
         """
-        processes = []
-        
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cpu_percent', 'memory_percent']):
-            try:
-                # Get process info
-                pinfo = proc.info
-                command = " ".join(pinfo['cmdline']) if pinfo['cmdline'] else pinfo['name']
-                
-                processes.append(
-                    f"PID: {pinfo['pid']}, Command: {command}, "
-                    f"CPU: {pinfo['cpu_percent']:.1f}%, Memory: {pinfo['memory_percent']:.1f}%"
-                )
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        
-        if not processes:
-            return "No processes found"
-        
-        return "\n".join(processes)
+        # Walking /proc and sampling CPU blocks, so do it in a worker thread
+        return await asyncio.to_thread(_list_processes)
 
     @mcp.tool()
     def kill_process(pid: int) -> str:
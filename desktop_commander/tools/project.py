@@ -7,89 +7,59 @@ in config.json), looking both at direct subdirectories and one level deeper to f
 """
 
 import os
-import sys
-import json
-import glob
-from typing import List, Dict, Optional
-from pathlib import Path
-from datetime import datetime
+import logging
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Union
+
+from desktop_commander import json_utils
+from desktop_commander.config import CONFIG_FILE
 
 # No longer importing the structured memo creator
 
+logger = logging.getLogger(__name__)
+
 # Load configuration
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config.json file."""
-    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+    """
+    Load configuration from config.json file.
+    
+    The result is cached; call load_config.cache_clear() to re-read the file.
+    """
     try:
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                return json.load(f)
-        else:
-            print(f"Warning: Config file not found at {config_path}", file=sys.stderr)
-            return {"project_default_path": "src"}
+        with open(CONFIG_FILE, "rb") as f:
+            return json_utils.loads(f.read())
+    except FileNotFoundError:
+        # No config is a normal setup, so only report it when debug logging is on
+        logger.debug("Config file not found at %s", CONFIG_FILE)
+        return {"project_default_path": "src"}
     except Exception as e:
-        print(f"Error loading config: {str(e)}", file=sys.stderr)
+        logger.warning("Error loading config: %s", e)
         return {"project_default_path": "src"}
 
 # Get the project default path from config
 config = load_config()
 PROJECT_DEFAULT_PATH = config.get("project_default_path", "src")
 
-# Expand the project path
+# Expand the project path once: an absolute PROJECT_DEFAULT_PATH is used
+# directly, otherwise it is relative to the home directory
+PROJECT_BASE_DIR = os.path.abspath(
+    PROJECT_DEFAULT_PATH if os.path.isabs(PROJECT_DEFAULT_PATH)
+    else os.path.join(os.path.expanduser("~"), PROJECT_DEFAULT_PATH)
+)
+
 def get_project_base_dir():
     """Get the expanded project base directory."""
-    home_dir = os.path.expanduser("~")
-    # If PROJECT_DEFAULT_PATH is an absolute path, use it directly
-    if os.path.isabs(PROJECT_DEFAULT_PATH):
-        return PROJECT_DEFAULT_PATH
-    # Otherwise, join with home directory
-    return os.path.join(home_dir, PROJECT_DEFAULT_PATH)
+    return PROJECT_BASE_DIR
 
-# Track the currently active project
-current_project = {
-    "path": None,
-    "name": None,
-    "type": None
-}
-
-def register_tools(mcp):
-    """Register project navigation tools with the MCP server."""
-    
-    # Import the knowledge graph manager here to avoid circular imports
-    from desktop_commander.tools.knowledge_graph import graph_manager
-    
-    @mcp.tool()
-    def explore_project(project_path: str = None) -> str:
-        """
-        Provides instructions for an agent to explore a project and store knowledge.
-        
-        Args:
-            project_path: Optional path to the project (uses current project if not specified)
-            
-        Returns:
-            Instructions for project exploration
-        """
-        try:
-            # Use current project if no path specified
-            if not project_path:
-                if not current_project["path"]:
-                    return "No active project. Use discover_projects and use_project to select a project."
-                project_path = current_project["path"]
-            
-            project_path = os.path.abspath(project_path)
-            if not os.path.exists(project_path):
-                return f"Project not found: {project_path}"
-            
-            # Get project info
-            project_info = _check_if_project(project_path) or {}
-            project_name = project_info.get("name") or os.path.basename(project_path)
-            project_type = project_info.get("type")
-            
-            # Get type-specific file suggestions
-            type_specific_files = _get_type_specific_files(project_type, project_path)
-            
-            # Instructions for the agent
-            instructions = f"""# Project Exploration Instructions: {project_name}
+# Instructions returned by explore_project, filled in with str.format_map
+EXPLORATION_INSTRUCTIONS_TEMPLATE = """# Project Exploration Instructions: {project_name}
 
 I'll assist you in exploring this project. Here's what you should do:
 
@@ -138,81 +108,405 @@ You can also use `sync_memory_to_project_knowledge("{project_name}")` if you've
 
 Would you like me to start exploring the project now?
 """
-            return instructions
-        except Exception as e:
-            return f"Error preparing project exploration: {str(e)}"
-            
-    def _get_type_specific_files(project_type, project_path):
-        """
-        Get type-specific file suggestions based on project type.
-        
-        Args:
-            project_type: Type of project (python, node, rust, etc.)
-            project_path: Path to the project
-            
-        Returns:
-            Type-specific file suggestions
-        """
-        # Initialize suggestions
-        suggestions = "\n   **Key Files to Examine First**:"
-        
-        # Get file suggestions based on project type
-        if project_type == "python":
-            suggestions += """
+
+# Key file suggestions for explore_project by project type; other types get the generic list
+KEY_FILE_SUGGESTIONS = {
+    "python": """
    - Look for `setup.py` or `pyproject.toml` for project configuration
    - Check for `requirements.txt` or `Pipfile` for dependencies
    - Look for `__main__.py` files as entry points
    - Examine any files named like `app.py`, `main.py`, or `run.py`
    - If a Django project, check for `settings.py`, `urls.py`, and `models.py`
-   - If a Flask project, look for an `app` variable or `create_app()` function"""
-        elif project_type == "node":
-            suggestions += """
+   - If a Flask project, look for an `app` variable or `create_app()` function""",
+    "node": """
    - Examine `package.json` for dependencies and scripts
    - Check for configuration files like `.babelrc`, `tsconfig.json`, `.eslintrc`
    - Look for entry points in `index.js`, `app.js`, or files referenced in package.json "main" field
    - Review `webpack.config.js` or similar build configs
-   - If a React project, look for components in `src/components` or similar directories"""
-        elif project_type == "rust":
-            suggestions += """
+   - If a React project, look for components in `src/components` or similar directories""",
+    "rust": """
    - Check `Cargo.toml` for dependencies and project metadata
    - Look at `src/main.rs` or `src/lib.rs` for entry points
    - Review `build.rs` if it exists for build configurations
-   - Examine `.cargo/config.toml` for toolchain configuration"""
-        elif project_type == "java":
-            suggestions += """
+   - Examine `.cargo/config.toml` for toolchain configuration""",
+    "java": """
    - Examine `pom.xml` (Maven) or `build.gradle` (Gradle) for dependencies
    - Look for main application classes that have a `main()` method
    - Review `application.properties` or `application.yml` for Spring Boot projects
-   - Check for `src/main/java` and `src/test/java` directories"""
-        elif project_type == "git":
-            # Generic suggestions for git repos without specific project type indicators
-            suggestions += """
+   - Check for `src/main/java` and `src/test/java` directories""",
+    "git": """
    - Look for README.md or similar documentation
    - Check for license files
    - Examine any Dockerfile or docker-compose.yml
    - Look for CI/CD configuration files (.github/workflows, .gitlab-ci.yml, etc.)
-   - Find entry point files like index.js, main.py, etc. in root or src directories"""
-        else:
-            # Generic suggestions
-            suggestions += """
+   - Find entry point files like index.js, main.py, etc. in root or src directories""",
+}
+
+# Files explore_project reports as found when they exist in the project root
+FOUND_KEY_FILES = ("README.md", "LICENSE", "Dockerfile", "docker-compose.yml")
+
+GENERIC_KEY_FILE_SUGGESTIONS = """
    - Look for README.md or similar documentation files
    - Check for configuration files in the project root
    - Examine any build or package files
    - Look for source code directories (src, lib, app, etc.)
    - Try to identify main entry point files"""
-           
-        # Check for file existence and add actual files found
-        actual_files = []
-        if os.path.exists(os.path.join(project_path, "README.md")):
-            actual_files.append("README.md")
+
+# Message returned by tools that need an active project when none is selected
+NO_ACTIVE_PROJECT_MSG = "No active project. Use discover_projects and use_project to select a project."
+
+@dataclass(frozen=True, slots=True)
+class CurrentProject:
+    """The active project. Immutable; selecting a project swaps in a new instance."""
+    path: Optional[str] = None
+    name: Optional[str] = None
+    type: Optional[str] = None
+
+# Track the currently active project
+current_project = CurrentProject()
+
+def _set_current_project(project: CurrentProject) -> None:
+    """Make project the active project by rebinding the module attribute in one step."""
+    global current_project
+    current_project = project
+
+def get_current_project_path() -> Optional[str]:
+    """
+    Get the path of the active project, or None if no project is selected.
+    
+    use_project does not change the process working directory; tools resolve
+    relative paths and run commands against this path instead.
+    """
+    return current_project.path
+
+# Files or directories that mark a project, with the type they imply, in priority order
+PROJECT_MARKERS = (
+    (".git", "git"),
+    ("package.json", "node"),
+    ("setup.py", "python"),
+    ("pom.xml", "java"),
+    ("Cargo.toml", "rust"),
+)
+
+# Directories that make an otherwise untyped directory count as a project
+COMMON_PROJECT_DIRS = ("src", "lib", "app", "source")
+
+# Results of _detect_project keyed by directory path, as (directory mtime_ns, project info,
+# subdirectory names). Adding or removing a marker or subdirectory changes the directory's
+# mtime, which invalidates the entry.
+PROJECT_CACHE_SIZE = 4096
+_project_cache: "OrderedDict[str, Tuple[int, Optional[Dict], Tuple[str, ...]]]" = OrderedDict()
+_project_cache_lock = threading.Lock()
+
+# Second-level discovery scans are I/O-bound; a handful of threads hides stat latency
+# without piling concurrent requests onto a slow (e.g. network) filesystem
+DISCOVERY_MAX_WORKERS = 8
+
+# Below this many directories to descend into, a thread pool costs more than it saves
+DISCOVERY_PARALLEL_MIN = 5
+
+# How many directory levels below the base search_for_project looks, matching discovery
+SEARCH_MAX_DEPTH = 2
+
+# Dependency and build output directories that discovery and search never descend into,
+# on top of hidden ones; they can be huge and never hold projects worth switching to
+SKIP_DIRS = frozenset({"node_modules", "__pycache__", "venv", "dist", "build", "out", "target"})
+
+# Last discover_projects result, reused briefly since the LLM tends to repeat the call
+DISCOVERY_CACHE_TTL = 30  # seconds
+_discover_cache = {"base": None, "timestamp": 0.0, "projects": None}
+
+# Rendered explore_project instructions keyed by project path, as (directory mtime_ns, text).
+# The text only depends on the project's root entries, which move the directory's mtime.
+EXPLORE_CACHE_SIZE = 256
+_explore_cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+
+def _detect_project(directory: str, dir_name: str) -> Tuple[Optional[Dict], Tuple[str, ...]]:
+    """
+    Inspect a directory for project markers.
+    
+    Returns (project info, ()) for a project. Otherwise returns (None, names of
+    its subdirectories), which discovery descends into without listing the
+    directory a second time.
+    """
+    # One directory read answers every marker check below
+    try:
+        with os.scandir(directory) as it:
+            entries = {entry.name: entry for entry in it}
+    except OSError:
+        return None, ()
+        
+    # Initialize project info
+    project_info = {
+        "name": dir_name,
+        "path": directory,
+        "type": None
+    }
+    
+    # Check for project indicators; the first match decides the type
+    for marker, project_type in PROJECT_MARKERS:
+        if marker in entries:
+            project_info["type"] = project_type
+            return project_info, ()
+        
+    # Look for common project directories
+    for common_dir in COMMON_PROJECT_DIRS:
+        entry = entries.get(common_dir)
+        if entry is not None and entry.is_dir():
+            return project_info, ()
+            
+    # Not enough evidence this is a project
+    return None, tuple(name for name, entry in entries.items() if entry.is_dir())
+
+
+def _invalidate_project_cache(directory: str) -> None:
+    """Drop any cached detection result or exploration instructions for a directory."""
+    with _project_cache_lock:
+        _project_cache.pop(directory, None)
+    _explore_cache.pop(directory, None)
+
+
+def _list_subdirs(directory: str) -> List[os.DirEntry]:
+    """Return entries for the subdirectories of a directory, or an empty list if it can't be read."""
+    try:
+        with os.scandir(directory) as it:
+            return [entry for entry in it if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _lookup_project(directory: Union[str, os.DirEntry]) -> Tuple[Optional[Dict], Tuple[str, ...]]:
+    """
+    Return the cached _detect_project result for a directory, refreshing it if
+    the directory changed since it was cached.
+    
+    Accepts a path or an os.DirEntry from a scan, whose name and path are reused.
+    The returned project info is the cached object and must not be modified.
+    """
+    try:
+        if isinstance(directory, os.DirEntry):
+            dir_name = directory.name
+            mtime_ns = directory.stat().st_mtime_ns
+            directory = directory.path
+        else:
+            dir_name = os.path.basename(directory)
+            mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None, ()
         
+    with _project_cache_lock:
+        cached = _project_cache.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            _project_cache.move_to_end(directory)
+            return cached[1], cached[2]
+            
+    project_info, subdirs = _detect_project(directory, dir_name)
+    
+    with _project_cache_lock:
+        _project_cache[directory] = (mtime_ns, project_info, subdirs)
+        _project_cache.move_to_end(directory)
+        while len(_project_cache) > PROJECT_CACHE_SIZE:
+            _project_cache.popitem(last=False)
+            
+    return project_info, subdirs
+
+
+def _check_if_project(directory: Union[str, os.DirEntry]) -> Optional[Dict]:
+    """
+    Check if a directory is a project and return project info.
+    
+    Accepts a path or an os.DirEntry from a scan, whose name and path are reused.
+    """
+    project_info = _lookup_project(directory)[0]
+    # Hand out copies; callers may keep or modify the result
+    return dict(project_info) if project_info else None
+
+
+def _is_skipped_dir(name: str) -> bool:
+    """Whether discovery and search should leave a directory alone: hidden or in SKIP_DIRS."""
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+def _find_nested_projects(directory: str, subdirs: Tuple[str, ...]) -> List[Dict]:
+    """Return project info for each of the named subdirectories of directory that looks like a project."""
+    projects = []
+    for name in subdirs:
+        if _is_skipped_dir(name):
+            continue
+        project_info = _check_if_project(os.path.join(directory, name))
+        if project_info:
+            projects.append(project_info)
+    return projects
+
+
+def _format_project_row(project: Dict) -> str:
+    """Format one project as a list line for discover_projects and search_for_project."""
+    project_type = f"Type: {project['type']}" if project.get("type") else ""
+    return f"- {project['name']} {project_type} - {project['path']}"
+
+
+def _discover_projects(base_dir: str) -> List[Dict]:
+    """
+    Find projects directly under base_dir, or one level deeper inside directories
+    that aren't projects themselves.
+    
+    Results are reused for DISCOVERY_CACHE_TTL seconds per base directory.
+    """
+    if (_discover_cache["base"] == base_dir
+            and time.monotonic() - _discover_cache["timestamp"] < DISCOVERY_CACHE_TTL):
+        return _discover_cache["projects"]
+    
+    projects = []
+    
+    # Look for direct subdirectories that might be projects. Detection lists each
+    # directory once and keeps the subdirectory names of those that aren't projects.
+    first_level = [(entry, *_lookup_project(entry)) for entry in _list_subdirs(base_dir)]
+    
+    # Directories that aren't projects themselves are checked one level deeper,
+    # unless they are hidden or dependency/build output; those scans are
+    # independent, so run them concurrently
+    nested_dirs = {entry.path: subdirs for entry, project_info, subdirs in first_level
+                   if not project_info and subdirs and not _is_skipped_dir(entry.name)}
+    if len(nested_dirs) >= DISCOVERY_PARALLEL_MIN:
+        with ThreadPoolExecutor(max_workers=min(DISCOVERY_MAX_WORKERS, len(nested_dirs))) as pool:
+            nested_projects = dict(zip(nested_dirs, pool.map(
+                _find_nested_projects, nested_dirs.keys(), nested_dirs.values())))
+    else:
+        nested_projects = {path: _find_nested_projects(path, subdirs) for path, subdirs in nested_dirs.items()}
+    
+    # Keep directory order: each project, or the projects nested under it
+    for entry, project_info, _ in first_level:
+        if project_info:
+            projects.append(dict(project_info))
+        else:
+            projects.extend(nested_projects.get(entry.path, ()))
+    
+    _discover_cache.update(base=base_dir, timestamp=time.monotonic(), projects=projects)
+    return projects
+
+
+def _walk_named(root: str, needle: str, max_depth: int):
+    """
+    Yield subdirectory entries of root whose lowercased name contains needle.
+    
+    Walks depth-first up to max_depth levels below root, testing names before
+    anything else is done with an entry. Hidden directories and SKIP_DIRS
+    are skipped. Symlinked directories can match but are never descended into,
+    so link cycles can't multiply the work.
+    """
+    for entry in _list_subdirs(root):
+        if _is_skipped_dir(entry.name):
+            continue
+        if needle in entry.name.lower():
+            yield entry
+        if max_depth > 1 and not entry.is_symlink():
+            yield from _walk_named(entry.path, needle, max_depth - 1)
+
+
+def _search_projects(base_dir: str, name: str) -> List[Dict]:
+    """
+    Find projects whose directory name contains name, case-insensitively.
+    
+    Searches two levels deep, the same depth discover_projects covers, and
+    skips hidden, dependency and build output directories as discovery does.
+    """
+    matches = []
+    for entry in _walk_named(base_dir, name.lower(), SEARCH_MAX_DEPTH):
+        project_info = _check_if_project(entry)
+        if project_info:
+            matches.append(project_info)
+    return matches
+
+
+def register_tools(mcp):
+    """Register project navigation tools with the MCP server."""
+    
+    # The knowledge graph tools import graph_manager when they run, so registering
+    # these tools doesn't load the knowledge graph module
+    
+    @mcp.tool()
+    def explore_project(project_path: str = None, force: bool = False) -> str:
+        """
+        Provides instructions for an agent to explore a project and store knowledge.
+        
+        Args:
+            project_path: Optional path to the project (uses current project if not specified)
+            force: Rebuild the instructions even if the project looks unchanged
+            
+        Returns:
+            Instructions for project exploration
+        """
+        try:
+            # Use current project if no path specified
+            if not project_path:
+                if not current_project.path:
+                    return NO_ACTIVE_PROJECT_MSG
+                project_path = current_project.path
+            
+            project_path = os.path.abspath(project_path)
+            try:
+                mtime_ns = os.stat(project_path).st_mtime_ns
+            except OSError:
+                return f"Project not found: {project_path}"
+            
+            if force:
+                _invalidate_project_cache(project_path)
+            else:
+                cached = _explore_cache.get(project_path)
+                if cached and cached[0] == mtime_ns:
+                    _explore_cache.move_to_end(project_path)
+                    return cached[1]
+            
+            # Get project info
+            project_info = _check_if_project(project_path) or {}
+            project_name = project_info.get("name") or os.path.basename(project_path)
+            project_type = project_info.get("type")
+            
+            # Get type-specific file suggestions
+            type_specific_files = _get_type_specific_files(project_type, project_path)
+            
+            # Instructions for the agent
+            instructions = EXPLORATION_INSTRUCTIONS_TEMPLATE.format_map({
+                "project_name": project_name,
+                "project_type": project_type,
+                "type_specific_files": type_specific_files
+            })
+            
+            _explore_cache[project_path] = (mtime_ns, instructions)
+            _explore_cache.move_to_end(project_path)
+            if len(_explore_cache) > EXPLORE_CACHE_SIZE:
+                _explore_cache.popitem(last=False)
+            return instructions
+        except Exception as e:
+            return f"Error preparing project exploration: {str(e)}"
+            
+    def _get_type_specific_files(project_type, project_path):
+        """
+        Get type-specific file suggestions based on project type.
+        
+        Args:
+            project_type: Type of project (python, node, rust, etc.)
+            project_path: Path to the project
+            
+        Returns:
+            Type-specific file suggestions
+        """
+        suggestions = KEY_FILE_SUGGESTIONS.get(project_type, GENERIC_KEY_FILE_SUGGESTIONS)
+        result = "\n   **Key Files to Examine First**:" + suggestions
+        
+        # Point out key files that actually exist, from a single directory listing
+        try:
+            names = set(os.listdir(project_path))
+        except OSError:
+            names = set()
+        actual_files = [name for name in FOUND_KEY_FILES if name in names]
         if actual_files:
-            suggestions += f"\n   - Found key files: {', '.join(actual_files)}"
+            result += f"\n   - Found key files: {', '.join(actual_files)}"
             
-        return suggestions
+        return result
     
     @mcp.tool()
-    def discover_projects(base_dir: Optional[str] = None) -> str:
+    async def discover_projects(base_dir: Optional[str] = None) -> str:
         """
         Discover potential projects in the specified directory or default project directory.
         
@@ -227,49 +521,20 @@ Would you like me to start exploring the project now?
         Returns:
             List of potential projects with their metadata
         """
-        base_dir = base_dir or get_project_base_dir()
         try:
-            base_dir = os.path.abspath(base_dir)
+            base_dir = os.path.abspath(base_dir) if base_dir else get_project_base_dir()
             if not os.path.exists(base_dir):
                 return f"Directory not found: {base_dir}"
                 
-            projects = []
-            
-            # Look for direct subdirectories that might be projects
-            for item in os.listdir(base_dir):
-                item_path = os.path.join(base_dir, item)
-                if not os.path.isdir(item_path):
-                    continue
-                
-                # Check if this directory looks like a project
-                project_info = _check_if_project(item_path)
-                if project_info:
-                    projects.append(project_info)
-                    
-                # If it's not a project itself, check one level deeper
-                elif os.path.isdir(item_path):
-                    try:
-                        for subitem in os.listdir(item_path):
-                            subitem_path = os.path.join(item_path, subitem)
-                            if not os.path.isdir(subitem_path):
-                                continue
-                            
-                            # Check if this subdirectory looks like a project
-                            sub_project_info = _check_if_project(subitem_path)
-                            if sub_project_info:
-                                projects.append(sub_project_info)
-                    except (PermissionError, OSError):
-                        # Skip directories we can't access
-                        pass
+            # Scan in a worker thread so the event loop keeps serving other calls
+            projects = await asyncio.to_thread(_discover_projects, base_dir)
             
             if not projects:
                 return f"No projects found in {base_dir}"
                 
             # Format results
             result = [f"Found {len(projects)} projects in {base_dir}:"]
-            for project in projects:
-                project_type = f"Type: {project['type']}" if project.get("type") else ""
-                result.append(f"- {project['name']} {project_type} - {project['path']}")
+            result.extend(_format_project_row(project) for project in projects)
                 
             return "\n".join(result)
         except Exception as e:
@@ -280,6 +545,9 @@ Would you like me to start exploring the project now?
         """
         Set the current working project and load its context.
         
+        The server's working directory is not changed. Relative paths in file
+        tools and commands run with execute_command resolve against the project.
+        
         Args:
             project_path: Path to the project directory
             
@@ -288,7 +556,6 @@ Would you like me to start exploring the project now?
         """
         try:
             base_dir = get_project_base_dir()
-            base_dir = os.path.abspath(base_dir)
             if not os.path.exists(base_dir):
                 return f"Base directory not found: {base_dir}"
                 
@@ -309,19 +576,21 @@ Would you like me to start exploring the project now?
             if not os.path.isdir(project_path):
                 return f"Not a directory: {project_path}"
             
-            # Update the current project
+            # Update the current project. Selecting a project is explicit, so
+            # re-check it rather than trust an entry that a coarse directory
+            # mtime may have kept alive
+            _invalidate_project_cache(project_path)
             project_info = _check_if_project(project_path)
             if not project_info:
                 return f"Not a recognized project: {project_path}"
                 
-            # Update current project and change directory
-            global current_project
-            current_project = project_info
-            os.chdir(project_path)
+            # Update current project. The process working directory is left
+            # alone; file tools and commands resolve against the project path.
+            _set_current_project(CurrentProject(**project_info))
             
             # Return project info message with path prefix guidance
             return f"""Switched to project: {project_info['name']}
-Current working directory is now: {project_path}
+Relative paths and commands now resolve against: {project_path}
 
 Working with the project files:
 - List files with: list_directory("{project_path}") or list_directory(".")
@@ -347,20 +616,20 @@ You can use explore_project() to analyze the project structure."""
         Returns:
             Current project info or message if no project is active
         """
-        global current_project
-        if not current_project["path"]:
-            return "No active project. Use discover_projects and use_project to select a project."
+        project = current_project
+        if not project.path:
+            return NO_ACTIVE_PROJECT_MSG
             
-        result = [f"Current project: {current_project['name']}"]
-        result.append(f"Path: {current_project['path']}")
+        result = [f"Current project: {project.name}"]
+        result.append(f"Path: {project.path}")
         
-        if current_project.get("type"):
-            result.append(f"Type: {current_project['type']}")
+        if project.type:
+            result.append(f"Type: {project.type}")
             
         return "\n".join(result)
     
     @mcp.tool()
-    def search_for_project(name: str, base_dir: Optional[str] = None) -> str:
+    async def search_for_project(name: str, base_dir: Optional[str] = None) -> str:
         """
         Search for a project by name in the specified base directory.
         
@@ -371,21 +640,13 @@ You can use explore_project() to analyze the project structure."""
         Returns:
             Project matches if found
         """
-        base_dir = base_dir or get_project_base_dir()
         try:
-            base_dir = os.path.abspath(base_dir)
+            base_dir = os.path.abspath(base_dir) if base_dir else get_project_base_dir()
             if not os.path.exists(base_dir):
                 return f"Base directory not found: {base_dir}"
                 
-            # Use glob to find matching directories
-            pattern = os.path.join(base_dir, f"**/*{name}*")
-            matches = []
-            
-            for path in glob.glob(pattern, recursive=True):
-                if os.path.isdir(path):
-                    project_info = _check_if_project(path)
-                    if project_info:
-                        matches.append(project_info)
+            # Scan in a worker thread so the event loop keeps serving other calls
+            matches = await asyncio.to_thread(_search_projects, base_dir, name)
             
             if not matches:
                 return f"No projects matching '{name}' found in {base_dir}"
@@ -393,8 +654,7 @@ You can use explore_project() to analyze the project structure."""
             # Format results
             result = [f"Found {len(matches)} projects matching '{name}':"]
             for project in matches:
-                project_type = f"Type: {project['type']}" if project.get("type") else ""
-                result.append(f"- {project['name']} {project_type} - {project['path']}")
+                result.append(_format_project_row(project))
                 result.append(f"  Use project with: use_project(\"{project['path']}\")")
                 
             return "\n".join(result)
@@ -432,11 +692,18 @@ You can use explore_project() to analyze the project structure."""
             Success or error message
         """
         try:
+            from datetime import datetime
+            
             # Access the knowledge_graph manager
-            from desktop_commander.tools.knowledge_graph import graph_manager
+            from desktop_commander.tools.knowledge_graph import graph_manager, encode_graph_payload, MAX_GRAPH_BYTES
+            
+            # Reject oversized payloads before parsing
+            raw = encode_graph_payload(project_knowledge)
+            if raw is None:
+                return f"Error: Project knowledge data too large (limit is {MAX_GRAPH_BYTES} bytes)"
             
             # Parse the knowledge data
-            data = json.loads(project_knowledge)
+            data = json_utils.loads(raw)
             
             # Validate required fields
             if "project_name" not in data:
@@ -472,7 +739,7 @@ Knowledge Graph Resources:
 - Entities by type: knowledge://{project_name}/entity_type/{{entity_type}}"""
             else:
                 return f"Failed to export knowledge graph for project: {project_name}"
-        except json.JSONDecodeError:
+        except json_utils.JSONDecodeError:
             return "Error: Invalid JSON data provided for knowledge graph"
         except Exception as e:
             return f"Error exporting project to knowledge graph: {str(e)}"
@@ -506,52 +773,6 @@ Knowledge Graph Resources:
                 "metadata": graph_data.get("metadata", {})
             }
             
-            return json.dumps(result, indent=2)
+            return json_utils.dumps(result)
         except Exception as e:
             return f"Error importing project from knowledge graph: {str(e)}"
-
-    # Helper functions (not exposed as tools)
-    def _check_if_project(directory: str) -> Optional[Dict]:
-        """Check if a directory is a project and return project info."""
-        if not os.path.isdir(directory):
-            return None
-            
-        dir_name = os.path.basename(directory)
-        
-        # Initialize project info
-        project_info = {
-            "name": dir_name,
-            "path": directory,
-            "type": None
-        }
-        
-        # Check for project indicators
-        if os.path.exists(os.path.join(directory, ".git")):
-            project_info["type"] = "git"
-            return project_info
-            
-        if os.path.exists(os.path.join(directory, "package.json")):
-            project_info["type"] = "node"
-            return project_info
-            
-        if os.path.exists(os.path.join(directory, "setup.py")):
-            project_info["type"] = "python"
-            return project_info
-            
-        if os.path.exists(os.path.join(directory, "pom.xml")):
-            project_info["type"] = "java"
-            return project_info
-            
-        if os.path.exists(os.path.join(directory, "Cargo.toml")):
-            project_info["type"] = "rust"
-            return project_info
-            
-        # Look for common project directories
-        common_dirs = ["src", "lib", "app", "source"]
-        for common_dir in common_dirs:
-            if os.path.isdir(os.path.join(directory, common_dir)):
-                return project_info
-                
-        # Not enough evidence this is a project
-        return None
-        
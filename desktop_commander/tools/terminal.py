@@ -3,40 +3,53 @@ Terminal tools for the Desktop Commander MCP Server.
 Includes command execution and session management.
 """
 
-import os
 import sys
+import codecs
 import signal
 import asyncio
-import subprocess
-import time
-import fcntl
-import select
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Optional
 
-# Session storage
+from desktop_commander.tools.project import get_current_project_path
+
+# Session storage. Completed sessions are kept oldest first so the oldest
+# can be evicted in O(1) once there are more than MAX_COMPLETED_SESSIONS.
+MAX_COMPLETED_SESSIONS = 100
 active_sessions = {}
-completed_sessions = {}
+completed_sessions: "OrderedDict[int, dict]" = OrderedDict()
 
-def _read_nonblocking(stream) -> str:
-    """Read from a stream without blocking."""
-    output = ""
-    
-    # Set non-blocking mode
-    fd = stream.fileno()
-    fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-    fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
-    
-    try:
-        # Check if there's data available to read
-        if select.select([stream], [], [], 0)[0]:
-            data = stream.read()
-            if data:
-                output += data
-    except:
-        pass
-        
-    return output
+# Unread output kept per session; past this only the most recent text is kept
+MAX_UNREAD_OUTPUT = 1024 * 1024  # characters
+
+def _store_completed_session(pid: int, record: dict) -> None:
+    """Record a finished session, evicting the oldest ones past the cap."""
+    completed_sessions[pid] = record
+    # A reused PID replaces the old record and counts as the newest
+    completed_sessions.move_to_end(pid)
+    while len(completed_sessions) > MAX_COMPLETED_SESSIONS:
+        completed_sessions.popitem(last=False)
+
+async def _drain(stream: asyncio.StreamReader, session: dict) -> None:
+    """
+    Append everything a process writes to one of its pipes to the session
+    until the pipe closes. Runs as a task for the life of the process, so
+    output keeps being collected after execute_command returns. From then on
+    only the unread output read_output serves is kept, capped at
+    MAX_UNREAD_OUTPUT.
+    """
+    # Decode incrementally so multi-byte characters split across reads survive
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await stream.read(4096)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            if not session["is_blocked"]:
+                session["output"] += text
+            unread = session["last_output"] + text
+            session["last_output"] = unread[-MAX_UNREAD_OUTPUT:] if len(unread) > MAX_UNREAD_OUTPUT else unread
+        if not chunk:
+            break
 
 def register_tools(mcp, command_manager):
     """Register terminal command tools with the MCP server."""
@@ -45,7 +58,8 @@ def register_tools(mcp, command_manager):
     async def execute_command(command: str, timeout_ms: int = 1000) -> str:
         """
         Execute a terminal command with timeout. Command will continue running 
-        in background if it doesn't complete within timeout.
+        in background if it doesn't complete within timeout. Commands run in the
+        active project's directory when one is selected.
         """
         print(f"Executing command: {command}", file=sys.stderr)
         
@@ -53,15 +67,12 @@ def register_tools(mcp, command_manager):
         if not command_manager.validate_command(command):
             return f"Command not allowed: {command}"
         
-        # Start the process
-        process = subprocess.Popen(
+        # Start the process in the active project, if any
+        process = await asyncio.create_subprocess_shell(
             command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            cwd=get_current_project_path(),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
         
         # Ensure process.pid is defined
@@ -72,6 +83,7 @@ def register_tools(mcp, command_manager):
         session = {
             "pid": process.pid,
             "process": process,
+            "output": "",
             "last_output": "",
             "is_blocked": False,
             "start_time": datetime.now()
@@ -79,49 +91,52 @@ def register_tools(mcp, command_manager):
         
         active_sessions[process.pid] = session
         
-        # Collect output for the timeout period
-        output = ""
-        start_time = time.time()
+        # The event loop delivers output to the session as it arrives
+        finished = asyncio.gather(
+            process.wait(),
+            _drain(process.stdout, session),
+            _drain(process.stderr, session)
+        )
         
-        while time.time() - start_time < timeout_ms / 1000:
-            # Check if process has completed
-            if process.poll() is not None:
-                stdout, stderr = process.communicate()
-                output += stdout + stderr
-                
-                # Store in completed sessions
-                completed_sessions[process.pid] = {
+        def on_finished(f: asyncio.Future) -> None:
+            # Nothing awaits this once execute_command returns; retrieve the outcome so
+            # a cancellation at shutdown isn't logged as an unretrieved exception
+            if f.cancelled() or f.exception() is not None:
+                return
+            # A command that outlived the timeout moves to the completed sessions
+            # when it exits, unless force_terminate already did that
+            if session["is_blocked"] and active_sessions.get(process.pid) is session:
+                _store_completed_session(process.pid, {
                     "pid": process.pid,
-                    "output": output,
+                    "output": session["last_output"],
                     "exit_code": process.returncode,
                     "start_time": session["start_time"],
                     "end_time": datetime.now()
-                }
-                
-                # Keep completed sessions manageable
-                if len(completed_sessions) > 100:
-                    oldest_pid = next(iter(completed_sessions))
-                    del completed_sessions[oldest_pid]
-                
-                # Remove from active sessions
-                if process.pid in active_sessions:
-                    del active_sessions[process.pid]
-                
-                return f"Process {process.pid} completed with exit code {process.returncode}.\nOutput:\n{output}"
+                })
+                del active_sessions[process.pid]
+        
+        finished.add_done_callback(on_finished)
+        
+        # Wait up to the timeout for the process to exit and its pipes to close.
+        # asyncio.wait leaves it running in the background if it doesn't.
+        done, _ = await asyncio.wait({finished}, timeout=timeout_ms / 1000)
+        output = session["output"]
+        
+        if done:
+            # Store in completed sessions
+            _store_completed_session(process.pid, {
+                "pid": process.pid,
+                "output": output,
+                "exit_code": process.returncode,
+                "start_time": session["start_time"],
+                "end_time": datetime.now()
+            })
             
-            # Read available output without blocking
-            stdout_data = _read_nonblocking(process.stdout)
-            stderr_data = _read_nonblocking(process.stderr)
+            # Remove from active sessions
+            if process.pid in active_sessions:
+                del active_sessions[process.pid]
             
-            if stdout_data:
-                output += stdout_data
-                session["last_output"] += stdout_data
-                
-            if stderr_data:
-                output += stderr_data
-                session["last_output"] += stderr_data
-                
-            await asyncio.sleep(0.1)
+            return f"Process {process.pid} completed with exit code {process.returncode}.\nOutput:\n{output}"
         
         # Timeout reached, mark as blocked and return current output
         session["is_blocked"] = True
@@ -160,7 +175,7 @@ def register_tools(mcp, command_manager):
         return f"No session found for PID {pid}"
 
     @mcp.tool()
-    def force_terminate(pid: int) -> str:
+    async def force_terminate(pid: int) -> str:
         """
         Force terminate a running terminal session.
         """
@@ -171,24 +186,24 @@ def register_tools(mcp, command_manager):
             session = active_sessions[pid]
             process = session["process"]
             
-            # First try SIGINT (Ctrl+C)
-            process.send_signal(signal.SIGINT)
-            
-            # Wait a bit for graceful termination
-            time.sleep(0.5)
-            
-            # If still running, force kill
-            if process.poll() is None:
-                process.kill()
+            if process.returncode is None:
+                # First try SIGINT (Ctrl+C)
+                process.send_signal(signal.SIGINT)
+                
+                # Wait a bit for graceful termination, then force kill
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    process.kill()
             
             # Store in completed sessions
-            completed_sessions[pid] = {
+            _store_completed_session(pid, {
                 "pid": pid,
                 "output": session["last_output"],
                 "exit_code": process.returncode if process.returncode is not None else -9,
                 "start_time": session["start_time"],
                 "end_time": datetime.now()
-            }
+            })
             
             # Remove from active sessions
             del active_sessions[pid]
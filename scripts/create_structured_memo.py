@@ -10,6 +10,7 @@ import json
 import re
 import glob
 import argparse
+from collections import Counter, deque
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -31,6 +32,69 @@ def load_schema():
         print(f"Error loading schema: {e}")
         return None
 
+# Directories that are never descended into when analyzing a project
+SKIP_DIRS = frozenset({
+    ".git", "node_modules", "__pycache__", "venv", ".venv", "env", ".env",
+    ".idea", ".vscode", "dist", "build", "target",
+})
+
+# Files in a project root that identify its technologies, in report order
+MARKER_FILES = (
+    ("package.json", "Node.js/JavaScript"),
+    ("setup.py", "Python"),
+    ("requirements.txt", "Python"),
+    ("Cargo.toml", "Rust"),
+    ("pom.xml", "Java/Maven"),
+    ("build.gradle", "Java/Gradle"),
+    ("CMakeLists.txt", "C++/CMake"),
+    ("Makefile", "C/C++"),
+    ("Dockerfile", "Docker"),
+    ("docker-compose.yml", "Docker Compose"),
+    ("go.mod", "Go"),
+    ("mix.exs", "Elixir"),
+    ("Gemfile", "Ruby"),
+)
+
+# The analysis stops once it has seen this many directories and files; the
+# summary only needs the most common directories and extensions
+MAX_DIRS_SAMPLED = 200
+MAX_FILES_SAMPLED = 5000
+
+# Number of directories kept in the analysis
+MAX_DIRS_LISTED = 20
+
+# Directory levels below the project root the analysis looks at
+MAX_SCAN_DEPTH = 4
+
+def _scan_tree(root: str, skip: frozenset = SKIP_DIRS, max_depth: int = MAX_SCAN_DEPTH):
+    """
+    Walk a directory tree breadth-first with os.scandir.
+    
+    Yields (entry, is_dir, depth) for every entry below root, where root's own
+    entries are at depth 1. Directories at max_depth are yielded but not
+    descended into. Directories named in skip are neither yielded nor
+    descended into, and symlinks are not followed.
+    """
+    pending = deque([(root, 1)])
+    while pending:
+        directory, depth = pending.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if entry.name in skip:
+                            continue
+                        if depth < max_depth:
+                            pending.append((entry.path, depth + 1))
+                    yield entry, is_dir, depth
+        except OSError:
+            # Skip directories we can't read, like os.walk does
+            continue
+
 def analyze_project(project_path: str) -> Dict[str, Any]:
     """
     Analyze a project directory to generate project information.
@@ -52,11 +116,19 @@ def analyze_project(project_path: str) -> Dict[str, Any]:
         "has_git": False,
         "directories": [],
         "file_types": {},
+        "sampled": False,
     }
     
+    # List the project root once; marker, git and README checks all use it
+    try:
+        with os.scandir(project_path) as entries:
+            top_names = {entry.name for entry in entries}
+    except OSError:
+        top_names = set()
+    
     # Check for repository information
     git_path = os.path.join(project_path, ".git")
-    analysis["has_git"] = os.path.exists(git_path)
+    analysis["has_git"] = ".git" in top_names
     
     # Get current branch if it's a git repository
     current_branch = None
@@ -75,50 +147,50 @@ def analyze_project(project_path: str) -> Dict[str, Any]:
     analysis["current_branch"] = current_branch
     
     # Check for common project files
-    common_files = {
-        "package.json": "Node.js/JavaScript",
-        "setup.py": "Python",
-        "requirements.txt": "Python",
-        "Cargo.toml": "Rust",
-        "pom.xml": "Java/Maven",
-        "build.gradle": "Java/Gradle",
-        "CMakeLists.txt": "C++/CMake",
-        "Makefile": "C/C++",
-        "Dockerfile": "Docker",
-        "docker-compose.yml": "Docker Compose",
-        "go.mod": "Go",
-        "mix.exs": "Elixir",
-        "Gemfile": "Ruby"
-    }
-    
-    for file, tech_type in common_files.items():
-        if os.path.exists(os.path.join(project_path, file)):
-            analysis["detected_types"].append(tech_type)
+    analysis["detected_types"] = [tech_type for file, tech_type in MARKER_FILES if file in top_names]
     
     # Collect directory structure information
     dirs = []
-    files_by_ext = {}
+    dirs_seen = 0
+    files_by_ext = Counter()
+    files_seen = 0
+    
+    # Entry paths all start with the project path, so slice it off instead of relpath
+    prefix_len = len(os.path.join(project_path, ""))
     
-    for root, directories, files in os.walk(project_path, topdown=True):
-        # Skip git and virtual environment directories
-        directories[:] = [d for d in directories if d not in [".git", "node_modules", "__pycache__", "venv", ".venv", "env", ".env"]]
+    for entry, is_dir, depth in _scan_tree(project_path):
+        # Counts past this point are lower bounds
+        if dirs_seen >= MAX_DIRS_SAMPLED and files_seen >= MAX_FILES_SAMPLED:
+            analysis["sampled"] = True
+            break
         
-        rel_path = os.path.relpath(root, project_path)
-        if rel_path != ".":
-            dirs.append(rel_path)
+        if is_dir:
+            dirs_seen += 1
+            if len(dirs) < MAX_DIRS_LISTED:
+                dirs.append(entry.path[prefix_len:])
+            # Directories at the depth limit are listed but not scanned
+            if depth >= MAX_SCAN_DEPTH:
+                analysis["sampled"] = True
+            continue
         
-        # Count file extensions
-        for file in files:
-            _, ext = os.path.splitext(file)
-            if ext:
-                ext = ext.lower()
-                files_by_ext[ext] = files_by_ext.get(ext, 0) + 1
+        # Count file extensions. Same rule as os.path.splitext on a bare name:
+        # the last dot starts the extension unless only dots precede it.
+        # Suffixes are counted as-is and case-folded once per distinct suffix below.
+        files_seen += 1
+        name = entry.name
+        dot = name.rfind(".")
+        if dot > 0 and (name[0] != "." or name[:dot].lstrip(".")):
+            files_by_ext[name[dot:]] += 1
     
-    analysis["directories"] = dirs[:20]  # Limit to top 20 directories
-    analysis["file_types"] = {k: v for k, v in sorted(files_by_ext.items(), key=lambda item: item[1], reverse=True)[:15]}
+    file_types = Counter()
+    for ext, count in files_by_ext.items():
+        file_types[ext.lower()] += count
+    
+    analysis["directories"] = dirs
+    analysis["file_types"] = dict(file_types.most_common(15))
     
     # Try to detect README for overview
-    readme_paths = glob.glob(os.path.join(project_path, "README*"))
+    readme_paths = [os.path.join(project_path, name) for name in sorted(top_names) if name.startswith("README")]
     readme_content = ""
     if readme_paths:
         try:
@@ -171,9 +243,13 @@ def create_structured_memo(project_path: str, output_path: Optional[str] = None)
         if paragraph:
             overview.append(" ".join(paragraph))
     
+    # Joined once; used in the overview and the knowledge base
+    detected_types = ", ".join(analysis["detected_types"])
+    key_directories = ", ".join(analysis["directories"][:5])
+    
     # Add detected technologies
-    if analysis["detected_types"]:
-        overview.append(f"Uses {', '.join(analysis['detected_types'])}")
+    if detected_types:
+        overview.append(f"Uses {detected_types}")
     
     # Create the structured memo
     today = datetime.now().strftime("%Y-%m-%d")
@@ -185,7 +261,7 @@ def create_structured_memo(project_path: str, output_path: Optional[str] = None)
         },
         "currentStatus": {
             "branch": analysis.get("current_branch") or "main",
-            "highlights": ["Initial project analysis completed"],
+            "highlights": ["Initial project analysis completed" + (" (sampled)" if analysis["sampled"] else "")],
             "lastUpdated": datetime.now().isoformat()
         },
         "actionItems": {
@@ -205,8 +281,8 @@ def create_structured_memo(project_path: str, output_path: Optional[str] = None)
         },
         "knowledgeBase": {
             "implementation": [
-                f"{', '.join(analysis['detected_types']) if analysis['detected_types'] else 'Unknown'} project structure",
-                f"Key directories: {', '.join(analysis['directories'][:5]) if analysis['directories'] else 'None identified'}"
+                f"{detected_types or 'Unknown'} project structure",
+                f"Key directories: {key_directories or 'None identified'}"
             ],
             "configuration": [],
             "environment": []
@@ -8,11 +8,20 @@ setup(
     author_email="you@example.com",
     packages=find_packages(),
     include_package_data=True,
+    package_data={
+        "desktop_commander.tools": ["data/*.js", "data/*.json"],
+    },
     install_requires=[
         "pydantic>=2.0.0",
         "psutil>=5.9.0",
         "rich>=13.4.0",
     ],
+    extras_require={
+        "speedups": [
+            "orjson>=3.9.0",
+            "zstandard>=0.21.0",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "desktop-commander-py=desktop_commander.mcp_server:main",